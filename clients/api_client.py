@@ -2,7 +2,7 @@
 API client for fetching documents from the document service.
 """
 import requests
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from tenacity import retry, stop_after_attempt, wait_exponential
 import time
 
@@ -56,19 +56,23 @@ class DocumentAPIClient:
             print(f"❌ Error fetching documents (page {page}): {str(e)}")
             raise
     
-    def get_all_documents(self, page_size: int = 10, max_documents: Optional[int] = None, start_page: int = 1) -> List[Dict[str, Any]]:
+    def iter_document_pages(self, page_size: int = 10, max_documents: Optional[int] = None,
+                            start_page: int = 1) -> Iterator[List[Dict[str, Any]]]:
         """
-        Fetch all documents using pagination.
+        Lazily fetch documents page by page.
+        
+        Only the current page is held in memory, so callers can start
+        processing before the whole corpus has been fetched.
         
         Args:
             page_size: Number of documents per page
             max_documents: Maximum number of documents to fetch (None for all)
             start_page: Page number to start fetching from (1-based)
             
-        Returns:
-            List of all documents
+        Yields:
+            Lists of documents, one per fetched page
         """
-        all_documents = []
+        fetched = 0
         page = start_page
         
         print(f"🔄 Starting to fetch documents (page_size: {page_size}, start_page: {start_page})")
@@ -89,28 +93,50 @@ class DocumentAPIClient:
                 if not documents:
                     break
                 
-                all_documents.extend(documents)
-                
-                print(f"📄 Fetched page {page}: {len(documents)} documents "
-                      f"(Total fetched: {len(all_documents)}, API Total: {response.get('total', '?')})")
-                
                 # Check if we've reached the max limit
-                if max_documents and len(all_documents) >= max_documents:
-                    all_documents = all_documents[:max_documents]
-                    print(f"🛑 Reached maximum document limit: {max_documents}")
-                    break
-                
-                # Check if this is the last page
-                if not response.get('has_next', False):
-                    break
+                reached_limit = bool(max_documents) and fetched + len(documents) >= max_documents
+                if reached_limit:
+                    documents = documents[:max_documents - fetched]
+                fetched += len(documents)
                 
-                page += 1
+                print(f"📄 Fetched page {page}: {len(documents)} documents "
+                      f"(Total fetched: {fetched}, API Total: {response.get('total', '?')})")
                 
+                has_next = response.get('has_next', False)
             except Exception as e:
                 print(f"❌ Error fetching page {page}: {str(e)}")
                 break
+            
+            yield documents
+            
+            if reached_limit:
+                print(f"🛑 Reached maximum document limit: {max_documents}")
+                break
+            
+            # Check if this is the last page
+            if not has_next:
+                break
+            
+            page += 1
+        
+        print(f"✅ Total documents fetched: {fetched}")
+    
+    def get_all_documents(self, page_size: int = 10, max_documents: Optional[int] = None, start_page: int = 1) -> List[Dict[str, Any]]:
+        """
+        Fetch all documents using pagination.
         
-        print(f"✅ Total documents fetched: {len(all_documents)}")
+        Args:
+            page_size: Number of documents per page
+            max_documents: Maximum number of documents to fetch (None for all)
+            start_page: Page number to start fetching from (1-based)
+            
+        Returns:
+            List of all documents
+        """
+        all_documents = []
+        for documents in self.iter_document_pages(page_size=page_size, max_documents=max_documents,
+                                                  start_page=start_page):
+            all_documents.extend(documents)
         return all_documents
     
     @retry(
@@ -3,10 +3,19 @@ MongoDB client for fetching goals and storing generated templates.
 """
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Set
 from bson import ObjectId
 from datetime import datetime
 
+# Wire compression for the large template payloads; zstd needs the optional
+# zstandard package, zlib is always available. Servers that support neither
+# simply negotiate an uncompressed connection.
+try:  # pragma: no cover - optional dependency
+    import zstandard  # type: ignore  # noqa: F401
+    _WIRE_COMPRESSORS = "zstd,zlib"
+except ImportError:  # pragma: no cover
+    _WIRE_COMPRESSORS = "zlib"
+
 class MongoDBClient:
     """Client for MongoDB operations."""
     
@@ -30,7 +39,7 @@ class MongoDBClient:
             True if connection successful, False otherwise
         """
         try:
-            self.client = MongoClient(self.connection_string)
+            self.client = MongoClient(self.connection_string, compressors=_WIRE_COMPRESSORS)
             
             # Test connection
             self.client.admin.command('ping')
@@ -40,6 +49,7 @@ class MongoDBClient:
             self.storage_db = self.client['ai']  # For storing results
             
             print("✅ MongoDB connection established")
+            self.ensure_indexes()
             return True
             
         except ConnectionFailure as e:
@@ -49,6 +59,29 @@ class MongoDBClient:
             print(f"❌ Unexpected error connecting to MongoDB: {str(e)}")
             return False
     
+    def ensure_indexes(self):
+        """
+        Ensure each template collection is indexed on document_uuid.
+        
+        Every upsert and existence check filters on document_uuid; without an
+        index each of them is a full collection scan. create_index is a no-op
+        when the index already exists.
+        """
+        if self.storage_db is None:
+            return
+        
+        for collection_name in ['questions', 'worksheets', 'summaries', 'mindmaps']:
+            collection = self.storage_db[collection_name]
+            try:
+                collection.create_index('document_uuid', unique=True)
+            except Exception as e:
+                # Legacy duplicates (or restricted permissions) prevent a unique index
+                print(f"⚠️ Could not create unique document_uuid index on {collection_name}: {str(e)}")
+                try:
+                    collection.create_index('document_uuid')
+                except Exception as e:
+                    print(f"⚠️ Could not create document_uuid index on {collection_name}: {str(e)}")
+    
     def disconnect(self):
         """Close MongoDB connection."""
         if self.client:
@@ -75,19 +108,16 @@ class MongoDBClient:
             
             # Query the lessonplangoals collection
             goals_collection = self.goals_db['lessonplangoals']
-            goals_cursor = goals_collection.find({
-                'lesson': lesson_object_id
-            })
-            
-            goals = list(goals_cursor)
-            
-            print(f"📋 Found {len(goals)} goals for custom_id: {custom_id}")
+            # Only goals with a title are used; let the server filter and project them
+            goals_cursor = goals_collection.find(
+                {'lesson': lesson_object_id, 'title': {'$nin': [None, '']}},
+                projection={'title': 1, '_id': 0}
+            )
             
             # Extract goal titles
-            goal_titles = []
-            for goal in goals:
-                if 'title' in goal and goal['title']:
-                    goal_titles.append(goal['title'])
+            goal_titles = [goal['title'] for goal in goals_cursor if goal.get('title')]
+            
+            print(f"📋 Found {len(goal_titles)} goals for custom_id: {custom_id}")
             
             return goal_titles
             
@@ -359,9 +389,44 @@ class MongoDBClient:
         
         try:
             collection = self.storage_db[template_type]
-            result = collection.find_one({'document_uuid': document_uuid})
+            result = collection.find_one({'document_uuid': document_uuid}, projection={'_id': 1})
             return result is not None
             
         except Exception as e:
             print(f"❌ Error checking document existence: {str(e)}")
             return False
+    
+    def get_existing_template_types(self, document_uuids: List[str],
+                                    collection_names: List[str]) -> Dict[str, Set[str]]:
+        """
+        Find which collections already hold content for a batch of documents.
+        
+        Runs one query per collection (``document_uuid`` ``$in`` the batch)
+        instead of one ``check_document_exists`` round-trip per document and type.
+        
+        Args:
+            document_uuids: Document UUIDs to check
+            collection_names: Collections to look in ('questions', 'worksheets', ...)
+            
+        Returns:
+            Mapping of document UUID -> set of collection names it exists in
+            (documents found in no collection are omitted)
+        """
+        existing: Dict[str, Set[str]] = {}
+        
+        if self.storage_db is None or not document_uuids:
+            return existing
+        
+        uuids = list({u for u in document_uuids if u})
+        for collection_name in collection_names:
+            try:
+                cursor = self.storage_db[collection_name].find(
+                    {'document_uuid': {'$in': uuids}},
+                    projection={'document_uuid': 1, '_id': 0}
+                )
+                for doc in cursor:
+                    existing.setdefault(doc.get('document_uuid'), set()).add(collection_name)
+            except Exception as e:
+                print(f"❌ Error checking existing documents in {collection_name}: {str(e)}")
+        
+        return existing
@@ -12,6 +12,14 @@ class Settings:
     NON_MATH_MODEL = os.getenv("OPENAI_MODEL_NORMAL", "gpt-4o-mini")
     MATH_MODEL = os.getenv("OPENAI_MODEL_MATH", "gpt-5")
     TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
+    # In-process cache of content analyses / generated goals keyed by content hash (0 disables)
+    ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "256"))
+    # Longer content is cut to its head (3/4) and tail (1/4) in analysis and goal prompts (0 sends it all)
+    ANALYSIS_MAX_PROMPT_CHARS = int(os.getenv("ANALYSIS_MAX_PROMPT_CHARS", "6000"))
+    # Request OpenAI JSON mode (response_format=json_object) for content analysis and goal calls
+    ANALYSIS_JSON_MODE = os.getenv("ANALYSIS_JSON_MODE", "true").lower() in ["1", "true", "yes"]
+    # Run the summary and mind map steps alongside the goals -> worksheet -> questions chain
+    PARALLEL_DOCUMENT_STEPS = os.getenv("PARALLEL_DOCUMENT_STEPS", "false").lower() in ["1", "true", "yes"]
     
     # Language Configuration
     SUPPORTED_LANGUAGES = ["arabic", "english"]
@@ -26,23 +34,32 @@ class Settings:
     }
     
     DIFFICULTY_LEVELS = [1, 2, 3]  # Easy, Medium, Hard
+    # Goal-based questions: per-goal LLM calls run on up to this many threads (1 keeps them sequential)
+    GOAL_QUESTION_WORKERS = int(os.getenv("GOAL_QUESTION_WORKERS", "4"))
     
     # Template Configuration
     AVAILABLE_TEMPLATES = ["questions", "worksheet", "summary", "goal_based_questions", "mindmap"]
 
     # Mind Map Configuration
-    MINDMAP_ENHANCED_THINKING = os.getenv("MINDMAP_ENHANCED_THINKING", "true").lower() in ["1", "true", "yes"]
+    # Extra planning call whose outline is passed into the main mind map prompt (doubles LLM calls)
+    MINDMAP_ENHANCED_THINKING = os.getenv("MINDMAP_ENHANCED_THINKING", "false").lower() in ["1", "true", "yes"]
+    # Request OpenAI JSON mode (response_format=json_object) for the main mind map call
+    MINDMAP_JSON_MODE = os.getenv("MINDMAP_JSON_MODE", "true").lower() in ["1", "true", "yes"]
     MINDMAP_MAX_NODES = int(os.getenv("MINDMAP_MAX_NODES", "120"))
     # Multi-pass generation to cover long content
     MINDMAP_MULTI_PASS = os.getenv("MINDMAP_MULTI_PASS", "true").lower() in ["1", "true", "yes"]
     MINDMAP_CHUNK_SIZE_CHARS = int(os.getenv("MINDMAP_CHUNK_SIZE_CHARS", "1800"))
     MINDMAP_CHUNK_OVERLAP_CHARS = int(os.getenv("MINDMAP_CHUNK_OVERLAP_CHARS", "250"))
+    # Multi-pass chunk calls run on up to this many threads (1 keeps them sequential)
+    MINDMAP_CHUNK_WORKERS = int(os.getenv("MINDMAP_CHUNK_WORKERS", "4"))
     # Deduplicate nodes across chunks using normalized text per parent
     MINDMAP_DEDUPLICATE_NODES = os.getenv("MINDMAP_DEDUPLICATE_NODES", "true").lower() in ["1", "true", "yes"]
     # Maximum allowed depth (root=0). Set to -1 for unlimited depth.
     MINDMAP_MAX_DEPTH = int(os.getenv("MINDMAP_MAX_DEPTH", "-1"))
     # Remove / ignore example or narrative style nodes
     MINDMAP_EXCLUDE_EXAMPLES = os.getenv("MINDMAP_EXCLUDE_EXAMPLES", "true").lower() in ["1", "true", "yes"]
+    # In-process cache of generated mind maps keyed by content hash (0 disables)
+    MINDMAP_CACHE_SIZE = int(os.getenv("MINDMAP_CACHE_SIZE", "128"))
     # Colors by depth (0=root, 1=main branches, 2=subtopics, 3+ deeper)
     MINDMAP_COLORS = [
         "gold",            # root
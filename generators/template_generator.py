@@ -1,4 +1,5 @@
 from typing import Dict, Any, List, Optional
+import threading
 from langchain_openai import ChatOpenAI
 
 from config.settings import Settings
@@ -26,8 +27,9 @@ class TemplateGenerator:
         Settings.validate_config()
         
         # Initialize language model
+        self._api_key = api_key or Settings.OPENAI_API_KEY
         self.model = ChatOpenAI(
-            api_key=api_key or Settings.OPENAI_API_KEY,
+            api_key=self._api_key,
             model=model_name or Settings.OPENAI_MODEL,
             temperature=Settings.TEMPERATURE
         )
@@ -38,14 +40,38 @@ class TemplateGenerator:
         self.validator = InputValidator()
         
         # Initialize template instances
-        self.templates = {
-            "questions": QuestionTemplate(self.model),
-            "worksheet": WorksheetTemplate(self.model),
-            "summary": SummaryTemplate(self.model),
-            "goal_based_questions": GoalBasedTemplate(self.model),
-            "mindmap": MindMapTemplate(self.model)
+        self.templates = self._build_templates(self.model)
+        # One template set per selected model (math / non-math). generate_template picks a set
+        # instead of re-pointing shared templates at another model, so concurrent calls for
+        # different steps or documents never see a model swapped mid-generation.
+        self._templates_by_model: Dict[str, Dict[str, Any]] = {str(self.model.model_name): self.templates}
+        self._templates_lock = threading.Lock()
+
+    @staticmethod
+    def _build_templates(model: ChatOpenAI) -> Dict[str, Any]:
+        """Create one instance of every template bound to the given model."""
+        return {
+            "questions": QuestionTemplate(model),
+            "worksheet": WorksheetTemplate(model),
+            "summary": SummaryTemplate(model),
+            "goal_based_questions": GoalBasedTemplate(model),
+            "mindmap": MindMapTemplate(model)
         }
 
+    def _templates_for(self, model_name: str) -> Dict[str, Any]:
+        """Return the template set bound to model_name, creating it on first use."""
+        with self._templates_lock:
+            templates = self._templates_by_model.get(model_name)
+            if templates is None:
+                model = ChatOpenAI(
+                    api_key=self._api_key,
+                    model=model_name,
+                    temperature=Settings.TEMPERATURE
+                )
+                templates = self._build_templates(model)
+                self._templates_by_model[model_name] = templates
+            return templates
+
     def _select_model_name(self, content_analysis: Dict[str, Any]) -> str:
         """Choose model name based on whether the content is mathematical."""
         try:
@@ -58,51 +84,6 @@ class TemplateGenerator:
             is_math = False
         return Settings.MATH_MODEL if is_math else Settings.NON_MATH_MODEL
 
-    def _apply_model_to_components(self, model_name: str):
-        """Instantiate a ChatOpenAI with the given model and apply it to all components."""
-        new_model = ChatOpenAI(
-            api_key=Settings.OPENAI_API_KEY,
-            model=model_name,
-            temperature=Settings.TEMPERATURE
-        )
-        # Update main reference
-        self.model = new_model
-        # Update content processor for future analyses
-        try:
-            self.content_processor.model = new_model
-        except Exception:
-            pass
-        # Update templates and any nested templates/tools
-        for key, tpl in self.templates.items():
-            try:
-                tpl.model = new_model
-                # If question template, reset math agent so it rebinds to new model lazily
-                if isinstance(tpl, QuestionTemplate):
-                    try:
-                        tpl.math_agent = None
-                    except Exception:
-                        pass
-                # GoalBasedTemplate holds nested templates
-                if isinstance(tpl, GoalBasedTemplate):
-                    try:
-                        tpl.question_template.model = new_model
-                        # reset nested question template math agent as well
-                        try:
-                            tpl.question_template.math_agent = None
-                        except Exception:
-                            pass
-                        tpl.worksheet_template.model = new_model
-                    except Exception:
-                        pass
-                # MindMapTemplate is straightforward
-                if isinstance(tpl, MindMapTemplate):
-                    try:
-                        tpl.model = new_model
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-    
     def generate_template(self, template_type: str, content: str, 
                          goals: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
         """
@@ -136,15 +117,14 @@ class TemplateGenerator:
         processed_content = self.content_processor.preprocess_content(content)
         content_analysis = self.content_processor.analyze_content(processed_content)
         
+        # Dynamically select model based on math detection and use the templates bound to it
+        selected_model_name = self._select_model_name(content_analysis)
+        template = self._templates_for(selected_model_name)[template_type]
+
         # Detect language and set template language
         detected_language = content_analysis["language"]
-        template = self.templates[template_type]
         template.set_language(detected_language)
 
-        # Dynamically select model based on math detection and apply it
-        selected_model_name = self._select_model_name(content_analysis)
-        self._apply_model_to_components(selected_model_name)
-
         # Enforce difficulty levels based on math/non-math for question generation
         if template_type in ["questions", "goal_based_questions"]:
             is_math = bool(
@@ -4,6 +4,12 @@ import json
 import argparse
 from typing import Dict, Any
 
+# Optional faster JSON library
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -23,8 +29,13 @@ def load_content_from_file(file_path: str) -> str:
 def save_result_to_file(result: Dict[str, Any], output_path: str):
     """Save the generated result to a JSON file."""
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        if orjson:
+            # orjson writes UTF-8 directly (no per-character escaping of Arabic text)
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
         print(f"✅ Result saved to: {output_path}")
     except Exception as e:
         print(f"❌ Error saving result: {str(e)}")
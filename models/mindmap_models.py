@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 
 class MindMapNode(BaseModel):
@@ -14,8 +14,8 @@ class MindMap(BaseModel):
     """Model for complete mind map structure compatible with GoJS."""
     nodeDataArray: List[MindMapNode] = Field(description="Array of all nodes in the mind map")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "nodeDataArray": [
                     {"key": 0, "text": "Main Topic", "loc": "0 0"},
@@ -24,15 +24,16 @@ class MindMap(BaseModel):
                 ]
             }
         }
+    )
 
 class MindMapResponse(BaseModel):
     """Response model for mind map generation including metadata."""
     class_: str = Field(default="go.TreeModel", alias="class", description="GoJS model class")
     nodeDataArray: List[MindMapNode] = Field(description="Array of all nodes in the mind map")
     
-    class Config:
-        populate_by_name = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        populate_by_name=True,
+        json_schema_extra={
             "example": {
                 "class": "go.TreeModel",
                 "nodeDataArray": [
@@ -41,3 +42,4 @@ class MindMapResponse(BaseModel):
                 ]
             }
         }
+    )
@@ -1,12 +1,19 @@
 """
 Data models for storing generated templates in MongoDB.
 """
+from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Records are built once per stored document: defer core-schema construction
+# to first use and tolerate extra keys coming from the API/DB.
+_RECORD_CONFIG = ConfigDict(defer_build=True, extra='ignore')
 
 class DocumentInfo(BaseModel):
     """Document information model."""
+    model_config = _RECORD_CONFIG
+
     uuid: str
     idx: str
     custom_id: str
@@ -15,6 +22,8 @@ class DocumentInfo(BaseModel):
 
 class GenerationMetadata(BaseModel):
     """Metadata for generated content."""
+    model_config = _RECORD_CONFIG
+
     generation_source: str = "template_generator"
     goals_source: str  # "database" or "default"
     content_length: int
@@ -22,6 +31,8 @@ class GenerationMetadata(BaseModel):
 
 class QuestionRecord(BaseModel):
     """Model for storing question records in MongoDB."""
+    model_config = _RECORD_CONFIG
+
     document_uuid: str
     document_idx: str
     custom_id: str
@@ -33,6 +44,8 @@ class QuestionRecord(BaseModel):
 
 class WorksheetRecord(BaseModel):
     """Model for storing worksheet records in MongoDB."""
+    model_config = _RECORD_CONFIG
+
     document_uuid: str
     document_idx: str
     custom_id: str
@@ -44,6 +57,8 @@ class WorksheetRecord(BaseModel):
 
 class SummaryRecord(BaseModel):
     """Model for storing summary records in MongoDB."""
+    model_config = _RECORD_CONFIG
+
     document_uuid: str
     document_idx: str
     custom_id: str
@@ -54,6 +69,8 @@ class SummaryRecord(BaseModel):
 
 class MindMapRecord(BaseModel):
     """Model for storing mind map records in MongoDB."""
+    model_config = _RECORD_CONFIG
+
     document_uuid: str
     document_idx: str
     custom_id: str
@@ -62,64 +79,45 @@ class MindMapRecord(BaseModel):
     generated_at: datetime = Field(default_factory=datetime.utcnow)
     metadata: GenerationMetadata
 
-class ProcessingStats(BaseModel):
-    """Statistics for processing session."""
+_TEMPLATE_TYPES = ("questions", "worksheets", "summaries", "mindmaps")
+
+
+def _template_counters() -> Dict[str, int]:
+    return dict.fromkeys(_TEMPLATE_TYPES, 0)
+
+
+@dataclass(slots=True)
+class ProcessingStats:
+    """Statistics for processing session (plain dataclass; never persisted, so no validation)."""
     total_documents: int = 0
     # Documents with at least one successful template generation
     processed_documents: int = 0
     # Documents where we attempted at least one template generation (excludes skips)
     documents_attempted: int = 0
-    successful_questions: int = 0
-    successful_worksheets: int = 0
-    successful_summaries: int = 0
-    successful_mindmaps: int = 0
     failed_documents: int = 0
     skipped_documents: int = 0
-    start_time: datetime = Field(default_factory=datetime.utcnow)
+    start_time: datetime = field(default_factory=datetime.utcnow)
     end_time: Optional[datetime] = None
-    # Optional granular counts (attempts & failures per template type)
-    attempts_questions: int = 0
-    attempts_worksheets: int = 0
-    attempts_summaries: int = 0
-    attempts_mindmaps: int = 0
-    failed_questions: int = 0
-    failed_worksheets: int = 0
-    failed_summaries: int = 0
-    failed_mindmaps: int = 0
+    # Per template type counters (successes, attempts & failures)
+    successful: Dict[str, int] = field(default_factory=_template_counters)
+    attempts: Dict[str, int] = field(default_factory=_template_counters)
+    failed: Dict[str, int] = field(default_factory=_template_counters)
     
     def add_success(self, template_type: str):
         """Add a successful generation."""
-        if template_type == "questions":
-            self.successful_questions += 1
-        elif template_type == "worksheets":
-            self.successful_worksheets += 1
-        elif template_type == "summaries":
-            self.successful_summaries += 1
-        elif template_type == "mindmaps":
-            self.successful_mindmaps += 1
+        if template_type in self.successful:
+            self.successful[template_type] += 1
         # NOTE: processed_documents is now document-level, incremented via mark_document_processed()
 
     def add_attempt(self, template_type: str):
         """Record an attempted generation (even if it later fails)."""
-        if template_type == "questions":
-            self.attempts_questions += 1
-        elif template_type == "worksheets":
-            self.attempts_worksheets += 1
-        elif template_type == "summaries":
-            self.attempts_summaries += 1
-        elif template_type == "mindmaps":
-            self.attempts_mindmaps += 1
+        if template_type in self.attempts:
+            self.attempts[template_type] += 1
 
     def add_template_failure(self, template_type: str):
         """Record a failure for a specific template type (does not mark whole document failed)."""
-        if template_type == "questions":
-            self.failed_questions += 1
-        elif template_type == "worksheets":
-            self.failed_worksheets += 1
-        elif template_type == "summaries":
-            self.failed_summaries += 1
-        elif template_type == "mindmaps":
-            self.failed_mindmaps += 1
+        if template_type in self.failed:
+            self.failed[template_type] += 1
     
     def add_failure(self):
         """Add a failed generation."""
@@ -153,24 +151,9 @@ class ProcessingStats(BaseModel):
             "total_documents": self.total_documents,
             "processed_documents": self.processed_documents,  # documents with ≥1 success
             "documents_attempted": self.documents_attempted,
-            "successful_generations": {
-                "questions": self.successful_questions,
-                "worksheets": self.successful_worksheets,
-                "summaries": self.successful_summaries,
-                "mindmaps": self.successful_mindmaps
-            },
-            "template_attempts": {
-                "questions": self.attempts_questions,
-                "worksheets": self.attempts_worksheets,
-                "summaries": self.attempts_summaries,
-                "mindmaps": self.attempts_mindmaps
-            },
-            "template_failures": {
-                "questions": self.failed_questions,
-                "worksheets": self.failed_worksheets,
-                "summaries": self.failed_summaries,
-                "mindmaps": self.failed_mindmaps
-            },
+            "successful_generations": dict(self.successful),
+            "template_attempts": dict(self.attempts),
+            "template_failures": dict(self.failed),
             "failed_documents": self.failed_documents,
             "skipped_documents": self.skipped_documents,
             "duration_seconds": self.get_duration(),
@@ -1,22 +1,57 @@
 """
 Batch processor for generating templates from multiple documents.
 """
-import time
-from typing import Dict, List, Any, Optional, Callable
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Callable, Set, Tuple, TYPE_CHECKING
 from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import threading
 
-from clients.api_client import DocumentAPIClient
-from clients.mongo_client import MongoDBClient
-from generators.template_generator import TemplateGenerator
-from models.storage_models import ProcessingStats, DocumentInfo
+from config.settings import Settings
+from models.storage_models import ProcessingStats
+
+if TYPE_CHECKING:  # only needed for annotations; callers construct and pass these in
+    from clients.api_client import DocumentAPIClient
+    from clients.mongo_client import MongoDBClient
+    from generators.template_generator import TemplateGenerator
+
+# Documents from these collections are never processed
+SKIP_COLLECTION_IDS = frozenset({
+    # 'd441cb83-1db7-472d-8ed7-43933399ad41',
+    # '1f7c2e76-f61d-4f6d-8425-6a7f43ad80c1',
+    # 'fabe3ac0-75a2-4765-995c-e6b94b7400e6',
+    # 'f1c13718-f6f9-46d5-be8a-3fcea6a4daee'
+})
+
+@lru_cache(maxsize=32)
+def _resolve_ordered_types(template_types: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Collection names to generate, in pipeline order (memoized per type tuple)."""
+    # Enforce generation order: summary -> worksheet -> questions -> mindmap
+    requested = {t if t.endswith('s') else f"{t}s" for t in template_types}
+    # If questions requested, also generate summary and worksheet as prerequisites
+    if "questions" in requested:
+        requested.update({"summaries", "worksheets"})
+    return tuple(t for t in ("summaries", "worksheets", "questions", "mindmaps") if t in requested)
+
+def _extract_refined_goals(worksheet_result: Any) -> List[str]:
+    """Goal texts from a worksheet: structured_goals first, flat goals as fallback."""
+    if not isinstance(worksheet_result, dict):
+        return []
+    structured = worksheet_result.get("structured_goals")
+    if isinstance(structured, list):
+        refined = [g["text"] for g in structured if isinstance(g, dict) and g.get("text")]
+        if refined:
+            return refined
+    flat_goals = worksheet_result.get("goals")
+    if isinstance(flat_goals, list):
+        return [text for text in map(str, flat_goals) if text.strip()]
+    return []
 
 class BatchProcessor:
     """Handles batch processing of documents for template generation."""
     
-    def __init__(self, api_client: DocumentAPIClient, mongo_client: MongoDBClient, 
-                 template_generator: TemplateGenerator):
+    def __init__(self, api_client: "DocumentAPIClient", mongo_client: "MongoDBClient", 
+                 template_generator: "TemplateGenerator"):
         """
         Initialize batch processor.
         
@@ -30,6 +65,10 @@ class BatchProcessor:
         self.template_generator = template_generator
         self.stats = ProcessingStats()
         self._lock = threading.Lock()
+        # uuid -> collections already holding content (filled per run when skip_existing)
+        self._existing_map: Optional[Dict[str, Set[str]]] = None
+        # Runs goal-independent steps (summary, mind map) concurrently during a run
+        self._step_executor: Optional[ThreadPoolExecutor] = None
     
     def process_all_documents(self, 
                             max_documents: Optional[int] = None,
@@ -60,39 +99,66 @@ class BatchProcessor:
         print(f"🔧 Max workers: {max_workers}")
         print(f"⏭️ Skip existing: {skip_existing}")
         
-        # Fetch all documents
-        documents = self.api_client.get_all_documents(
-            page_size=page_size, 
-            max_documents=max_documents,
-            start_page=start_page
-        )
+        # Stream documents page by page; existence checks run once per page
+        self.stats.total_documents = 0
+        self._existing_map = {} if skip_existing else None
+        documents = self._iter_documents(page_size, max_documents, start_page, template_types)
+        
+        if Settings.PARALLEL_DOCUMENT_STEPS:
+            # Up to two independent steps per document in flight
+            self._step_executor = ThreadPoolExecutor(max_workers=2 * max_workers)
         
-        self.stats.total_documents = len(documents)
+        # Process documents
+        try:
+            if max_workers == 1:
+                # Sequential processing
+                self._process_documents_sequential(documents, template_types, skip_existing)
+            else:
+                # Parallel processing
+                self._process_documents_parallel(documents, template_types, skip_existing, max_workers)
+        finally:
+            if self._step_executor is not None:
+                self._step_executor.shutdown(wait=True)
+                self._step_executor = None
         
-        if not documents:
+        if not self.stats.total_documents:
             print("❌ No documents found")
             return self.stats
         
-        print(f"📄 Processing {len(documents)} documents...")
-        
-        # Process documents
-        if max_workers == 1:
-            # Sequential processing
-            self._process_documents_sequential(documents, template_types, skip_existing)
-        else:
-            # Parallel processing
-            self._process_documents_parallel(documents, template_types, skip_existing, max_workers)
-        
         self.stats.finish()
         self._print_final_stats()
         
         return self.stats
     
-    def _process_documents_sequential(self, documents: List[Dict[str, Any]], 
+    def _iter_documents(self, page_size: int, max_documents: Optional[int], start_page: int,
+                        template_types: List[str]) -> Iterator[Dict[str, Any]]:
+        """Yield documents as their pages arrive, counting them and (when
+        skipping existing) looking up each page's stored templates in one batch."""
+        collection_names = [t if t.endswith('s') else f"{t}s" for t in template_types]
+        for page in self.api_client.iter_document_pages(
+            page_size=page_size,
+            max_documents=max_documents,
+            start_page=start_page
+        ):
+            self.stats.total_documents += len(page)
+            if self._existing_map is not None:
+                self._existing_map.update(self.mongo_client.get_existing_template_types(
+                    [doc.get('uuid') for doc in page], collection_names
+                ))
+            yield from page
+    
+    def _sync_progress_total(self, pbar: tqdm):
+        """Grow the progress bar total as more pages are fetched."""
+        if pbar.total != self.stats.total_documents:
+            pbar.total = self.stats.total_documents
+            pbar.refresh()
+    
+    def _process_documents_sequential(self, documents: Iterable[Dict[str, Any]], 
                                     template_types: List[str], skip_existing: bool):
         """Process documents sequentially."""
-        with tqdm(total=len(documents), desc="Processing documents") as pbar:
+        with tqdm(total=self.stats.total_documents, desc="Processing documents") as pbar:
             for i, document in enumerate(documents):
+                self._sync_progress_total(pbar)
                 try:
                     self._process_single_document(document, template_types, skip_existing)
                     pbar.set_postfix({
@@ -105,35 +171,48 @@ class BatchProcessor:
                     self.stats.add_failure()
                 finally:
                     pbar.update(1)
-                    # Small delay to avoid overwhelming services
-                    time.sleep(0.1)
     
-    def _process_documents_parallel(self, documents: List[Dict[str, Any]], 
+    def _process_documents_parallel(self, documents: Iterable[Dict[str, Any]], 
                                   template_types: List[str], skip_existing: bool, max_workers: int):
         """Process documents in parallel."""
+        # Keep a bounded window of tasks in flight instead of submitting every
+        # document up front
+        max_in_flight = max_workers * 4
+        doc_iter = iter(documents)
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            futures = {
-                executor.submit(self._process_single_document, doc, template_types, skip_existing): doc 
-                for doc in documents
-            }
-            
-            # Process completed tasks
-            with tqdm(total=len(documents), desc="Processing documents") as pbar:
-                for future in as_completed(futures):
-                    document = futures[future]
-                    try:
-                        future.result()
-                        pbar.set_postfix({
-                            'Success': f"{self.stats.processed_documents}/{self.stats.total_documents}",
-                            'Failed': self.stats.failed_documents
-                        })
-                    except Exception as e:
-                        print(f"❌ Error processing document {document.get('filename', 'Unknown')}: {str(e)}")
-                        with self._lock:
-                            self.stats.add_failure()
-                    finally:
-                        pbar.update(1)
+            in_flight = {}  # future -> filename
+
+            def submit_next() -> bool:
+                doc = next(doc_iter, None)
+                if doc is None:
+                    return False
+                future = executor.submit(self._process_single_document, doc, template_types, skip_existing)
+                in_flight[future] = doc.get('filename', 'Unknown')
+                return True
+
+            while len(in_flight) < max_in_flight and submit_next():
+                pass
+
+            # Process completed tasks, topping the window back up as they finish
+            with tqdm(total=self.stats.total_documents, desc="Processing documents") as pbar:
+                while in_flight:
+                    self._sync_progress_total(pbar)
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        filename = in_flight.pop(future)
+                        try:
+                            future.result()
+                            pbar.set_postfix({
+                                'Success': f"{self.stats.processed_documents}/{self.stats.total_documents}",
+                                'Failed': self.stats.failed_documents
+                            })
+                        except Exception as e:
+                            print(f"❌ Error processing document {filename}: {str(e)}")
+                            with self._lock:
+                                self.stats.add_failure()
+                        finally:
+                            pbar.update(1)
+                        submit_next()
     
     def _process_single_document(self, document_data: Dict[str, Any], 
                                template_types: List[str], skip_existing: bool):
@@ -153,14 +232,7 @@ class BatchProcessor:
         document_had_success = False  # track if at least one template stored successfully
         
         # Skip documents with specific collection IDs
-        skip_collection_ids = [
-            # 'd441cb83-1db7-472d-8ed7-43933399ad41',
-            # '1f7c2e76-f61d-4f6d-8425-6a7f43ad80c1',
-            # 'fabe3ac0-75a2-4765-995c-e6b94b7400e6',
-            # 'f1c13718-f6f9-46d5-be8a-3fcea6a4daee'
-        ]
-        
-        if collection_id in skip_collection_ids:
+        if collection_id in SKIP_COLLECTION_IDS:
             print(f"⏭️ Skipping document {filename} - collection_id {collection_id} is in skip list")
             with self._lock:
                 self.stats.add_skip()
@@ -175,9 +247,17 @@ class BatchProcessor:
         # Check if we should skip existing documents
         if skip_existing:
             existing_types = []
+            existing_collections = (
+                self._existing_map.get(document_uuid, set())
+                if self._existing_map is not None else None
+            )
             for template_type in template_types:
                 collection_name = template_type if template_type.endswith('s') else f"{template_type}s"
-                if self.mongo_client.check_document_exists(document_uuid, collection_name):
+                if existing_collections is not None:
+                    exists = collection_name in existing_collections
+                else:
+                    exists = self.mongo_client.check_document_exists(document_uuid, collection_name)
+                if exists:
                     existing_types.append(template_type)
             
             if existing_types:
@@ -189,70 +269,58 @@ class BatchProcessor:
                     return
                 template_types = remaining_types
         
-        # Enforce generation order: summary -> worksheet -> questions -> mindmap
-        requested = set([t if t.endswith('s') else f"{t}s" for t in template_types])
-        # If questions requested, also generate summary and worksheet as prerequisites
-        if "questions" in requested:
-            requested.update({"summaries", "worksheets"})
-        ordered_types = [t for t in ["summaries", "worksheets", "questions", "mindmaps"] if t in requested]
+        ordered_types = _resolve_ordered_types(tuple(template_types))
         # Mark that we are attempting this document (if any ordered types)
         if ordered_types:
             with self._lock:
                 self.stats.start_document_attempt()
 
-        # Step 1: Summary
-        summary_result = None
-        if any(t in ordered_types for t in ["summaries"]):
-            try:
-                with self._lock:
-                    self.stats.add_attempt("summaries")
-                summary_result = self.template_generator.generate_summary(content=content)
-                if self.mongo_client.store_summary(document_data, summary_result):
-                    with self._lock:
-                        self.stats.add_success("summaries")
-                    document_had_success = True
-                else:
-                    print(f"⚠️ No changes made for summary: {filename}")
-            except Exception as e:
-                print(f"❌ Failed to generate summary for {filename}: {str(e)}")
-                with self._lock:
-                    self.stats.add_template_failure("summaries")
-
-        # Step 2: Goals (DB -> AI)
+        # Step 1: Goals (DB -> AI), only needed by worksheets/questions
         goals = []
-        if custom_id:
-            goals = self.mongo_client.get_goals_by_custom_id(custom_id)
-        if not goals:
-            # AI-generate goals from content (no default static list)
-            try:
-                goals = self.template_generator.content_processor.generate_learning_goals(content, count=5)
-                print(f"🎯 AI-generated {len(goals)} goals")
-            except Exception as e:
-                print(f"❌ Failed to AI-generate goals, proceeding with empty goals: {str(e)}")
-                goals = []
+        if "worksheets" in ordered_types or "questions" in ordered_types:
+            if custom_id:
+                goals = self.mongo_client.get_goals_by_custom_id(custom_id)
+            if not goals:
+                # AI-generate goals from content (no default static list). The fused call
+                # also analyzes the content, which the template generator then reuses.
+                try:
+                    content_processor = self.template_generator.content_processor
+                    _, goals = content_processor.analyze_and_generate_goals(
+                        content_processor.preprocess_content(content), count=5
+                    )
+                    print(f"🎯 AI-generated {len(goals)} goals")
+                except Exception as e:
+                    print(f"❌ Failed to AI-generate goals, proceeding with empty goals: {str(e)}")
+                    goals = []
+
+        # Summary and mind map don't depend on goals: with a step executor they run
+        # alongside the worksheet -> questions chain instead of in pipeline order
+        run_alongside = self._step_executor is not None and (
+            "summaries" in ordered_types or "mindmaps" in ordered_types
+        )
+        step_futures = []
+        if run_alongside:
+            if Settings.ANALYSIS_CACHE_SIZE > 0:
+                # Warm the shared analysis cache so concurrent steps don't each analyze the content
+                self.template_generator.get_content_analysis(content)
+            if "summaries" in ordered_types:
+                step_futures.append(self._step_executor.submit(self._generate_summary_step, document_data, content))
+            if "mindmaps" in ordered_types:
+                step_futures.append(self._step_executor.submit(self._generate_mindmap_step, document_data, content))
+
+        # Step 2: Summary
+        elif "summaries" in ordered_types:
+            document_had_success |= self._generate_summary_step(document_data, content)
 
         # Step 3: Worksheet (may refine goals)
         worksheet_result = None
-        if any(t in ordered_types for t in ["worksheets"]):
+        if "worksheets" in ordered_types:
             try:
                 with self._lock:
                     self.stats.add_attempt("worksheets")
                 worksheet_result = self.template_generator.generate_worksheet(content=content, goals=goals)
                 # Prefer structured goals if provided by template
-                refined_goals = []
-                if isinstance(worksheet_result, dict):
-                    # If structured_goals present
-                    structured = worksheet_result.get("structured_goals") or []
-                    if structured and isinstance(structured, list):
-                        for g in structured:
-                            text = g.get("text") if isinstance(g, dict) else None
-                            if text:
-                                refined_goals.append(text)
-                    # Fallback to flat goals in worksheet
-                    if not refined_goals:
-                        flat_goals = worksheet_result.get("goals")
-                        if isinstance(flat_goals, list):
-                            refined_goals = [str(x) for x in flat_goals if str(x).strip()]
+                refined_goals = _extract_refined_goals(worksheet_result)
                 # Use refined goals if available
                 if refined_goals:
                     goals = refined_goals
@@ -268,7 +336,7 @@ class BatchProcessor:
                     self.stats.add_template_failure("worksheets")
 
         # Step 4: Questions (use final goals; include math reasoning if analysis suggests)
-        if any(t in ordered_types for t in ["questions"]):
+        if "questions" in ordered_types:
             try:
                 with self._lock:
                     self.stats.add_attempt("questions")
@@ -295,26 +363,52 @@ class BatchProcessor:
                     self.stats.add_template_failure("questions")
 
         # Step 5: Mind Map
-        if any(t in ordered_types for t in ["mindmaps"]):
-            try:
-                with self._lock:
-                    self.stats.add_attempt("mindmaps")
-                mindmap_result = self.template_generator.generate_mindmap(content=content)
-                if self.mongo_client.store_mindmap(document_data, mindmap_result):
-                    with self._lock:
-                        self.stats.add_success("mindmaps")
-                    document_had_success = True
-                else:
-                    print(f"⚠️ No changes made for mindmap: {filename}")
-            except Exception as e:
-                print(f"❌ Failed to generate mindmap for {filename}: {str(e)}")
-                with self._lock:
-                    self.stats.add_template_failure("mindmaps")
+        if "mindmaps" in ordered_types and not run_alongside:
+            document_had_success |= self._generate_mindmap_step(document_data, content)
+
+        for future in step_futures:
+            document_had_success |= future.result()
 
         # After all templates attempted, mark document processed if any success
         with self._lock:
             self.stats.mark_document_processed(document_had_success)
     
+    def _generate_summary_step(self, document_data: Dict[str, Any], content: str) -> bool:
+        """Generate and store the summary; True if it was stored."""
+        filename = document_data.get('filename', 'Unknown')
+        try:
+            with self._lock:
+                self.stats.add_attempt("summaries")
+            summary_result = self.template_generator.generate_summary(content=content)
+            if self.mongo_client.store_summary(document_data, summary_result):
+                with self._lock:
+                    self.stats.add_success("summaries")
+                return True
+            print(f"⚠️ No changes made for summary: {filename}")
+        except Exception as e:
+            print(f"❌ Failed to generate summary for {filename}: {str(e)}")
+            with self._lock:
+                self.stats.add_template_failure("summaries")
+        return False
+    
+    def _generate_mindmap_step(self, document_data: Dict[str, Any], content: str) -> bool:
+        """Generate and store the mind map; True if it was stored."""
+        filename = document_data.get('filename', 'Unknown')
+        try:
+            with self._lock:
+                self.stats.add_attempt("mindmaps")
+            mindmap_result = self.template_generator.generate_mindmap(content=content)
+            if self.mongo_client.store_mindmap(document_data, mindmap_result):
+                with self._lock:
+                    self.stats.add_success("mindmaps")
+                return True
+            print(f"⚠️ No changes made for mindmap: {filename}")
+        except Exception as e:
+            print(f"❌ Failed to generate mindmap for {filename}: {str(e)}")
+            with self._lock:
+                self.stats.add_template_failure("mindmaps")
+        return False
+    
     def _get_goals_for_document(self, custom_id: str, content: str) -> List[str]:
         """Deprecated: goals now come from DB or AI; left for backward compatibility."""
         goals = []
@@ -1,21 +1,129 @@
 import re
+import hashlib
 import json
-from typing import List, Dict, Any, Optional
-from utils.language_detector import LanguageDetector
+import threading
+from collections import Counter, OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+from utils.json_copy import copy_json
+from utils.json_extract import iter_json_objects
+from utils.language_detector import detect_language
 from config.settings import Settings
 from langchain_openai import ChatOpenAI
 
+# Optional faster JSON library
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+_json_loads = orjson.loads if orjson else json.loads
+
+# Keys the LLM content analysis must return (shared by the analysis prompts)
+ANALYSIS_KEYS_SPEC = (
+    "language (\"arabic\" or \"english\"), "
+    "estimated_reading_time (int, minutes), complexity_level (one of: simple, medium, complex), "
+    "key_topics (array of 3-7 short keywords in the same language as the content, no markup), "
+    "is_mathematical (boolean), math_concepts (array of up to 10 concise math terms, empty if not mathematical; do not include symbols or punctuation-only items), "
+    "has_equations (boolean), has_numbers (boolean), subject_area (one of: mathematics, science, language, literature, history, general)"
+)
+
+# Static instruction blocks come first and per-call values (hints, content) last, so
+# repeated calls share a byte-identical prefix that providers can prompt-cache.
+ANALYSIS_PROMPT_HEADER = (
+    "You are an expert educational content analyst.\n"
+    "Analyze the following content and return ONLY a strict JSON object with these exact keys: \n"
+    f"{ANALYSIS_KEYS_SPEC}.\n"
+    "Use your own judgment based on the content; don't echo the content.\n"
+    "If the content is not about math, set is_mathematical=false and math_concepts=[].\n\n"
+)
+
+ANALYSIS_AND_GOALS_PROMPT_HEADER = (
+    "You are an expert educational content analyst and curriculum designer.\n"
+    "Return ONLY a strict JSON object with exactly two keys:\n"
+    f"\"analysis\": an object with these exact keys: {ANALYSIS_KEYS_SPEC};\n"
+    "\"goals\": an array of clear, measurable learning goals appropriate to the content, "
+    "in the requested count and language.\n"
+    "Use your own judgment based on the content; don't echo the content.\n"
+    "If the content is not about math, set is_mathematical=false and math_concepts=[].\n\n"
+)
+
+# System line for the goals-only prompt, by goals language
+GOALS_SYSTEM_PROMPTS = {
+    "arabic": (
+        "أنت خبير مناهج تعليمية. أنشئ أهداف تعلم واضحة وقابلة للقياس ومناسبة للمحتوى. "
+        "أعد إجابة بصيغة JSON فقط: {\"goals\":[\"goal1\",...]}. لا تُضِف أي نص آخر."
+    ),
+    "english": (
+        "You are an expert curriculum designer. Create clear, measurable learning goals appropriate to the content. "
+        "Respond ONLY as strict JSON: {\"goals\":[\"goal1\",...]}. No extra text."
+    ),
+}
+
+# Precompiled patterns for the heuristic fallbacks
+_MATH_SYMBOLS_RE = re.compile(r'[+*/=<>≤≥∑∏∫∂√π∞%]')
+_EQUATION_RE = re.compile(r'[\w\u0621-\u064A]+\s*[=<>≤≥]\s*[\w\u0621-\u064A]+')
+_NUMBER_RE = re.compile(r'\d+')
+_EQUATION_PATTERNS = (_EQUATION_RE,) + tuple(re.compile(p) for p in (  # x = y or inequalities (Arabic/English)
+    r'\d+\s*[+\-*/×÷\^]\s*\d+',  # basic arithmetic
+    r'[\w\u0621-\u064A]+\s*[<>≤≥]\s*[\w\u0621-\u064A]+',  # inequalities
+    r'\w+\^\d+',  # exponents
+    r'sqrt\(\w+\)',  # square roots
+    r'log\(\w+\)',  # logarithms
+))
+
+_SUBJECT_INDICATORS = {
+    "mathematics": ["رياضيات", "معادلة", "جبر", "هندسة", "math", "algebra", "geometry", "equation"],
+    "science": ["علوم", "فيزياء", "كيمياء", "أحياء", "science", "physics", "chemistry", "biology"],
+    "language": ["لغة", "نحو", "صرف", "grammar", "language", "reading", "writing"],
+    "literature": ["أدب", "شعر", "قصة", "رواية", "literature", "poetry", "novel", "story"],
+    "history": ["تاريخ", "حضارة", "قرن", "history", "ancient", "modern", "century"],
+}
+# One alternation finds every whole-word indicator in a single scan of the text
+_SUBJECT_INDICATOR_RE = re.compile(
+    r'(?<!\w)(?:' + '|'.join(re.escape(ind) for inds in _SUBJECT_INDICATORS.values() for ind in inds) + r')(?!\w)'
+)
+
+_TOPIC_STRIP_CHARS = ".,!?;:\"'()[]{}"
+_TOPIC_STOP_WORDS = {
+    "arabic": frozenset({"في", "من", "إلى", "على", "عن", "مع", "هذا", "هذه", "التي", "الذي", "أن", "كان", "يكون"}),
+    "english": frozenset({"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "is", "are", "was"}),
+}
+
+def _bounded_content(content: str) -> str:
+    """Head and tail of long content for analysis/goal prompts; a sample is enough to
+    infer language, topics and complexity, and keeps prompt size flat for long documents."""
+    max_chars = Settings.ANALYSIS_MAX_PROMPT_CHARS
+    if max_chars <= 0 or len(content) <= max_chars:
+        return content
+    head = max_chars * 3 // 4
+    return content[:head] + "\n...\n" + content[-(max_chars - head):]
+
+def _model_identity(model: Any) -> Tuple[Optional[str], Optional[float]]:
+    """(model name, temperature) of an LLM, for cache keys."""
+    model_name = getattr(model, "model_name", None) or getattr(model, "model", None)
+    return (str(model_name) if model_name else None, getattr(model, "temperature", None))
+
+
 class ContentProcessor:
     """Processes educational content for template generation using AI-driven analysis."""
 
+    # Shared LRU of LLM results (analyses and goal lists), keyed by content hash + model params
+    _llm_cache: "OrderedDict[Tuple, Any]" = OrderedDict()
+    _llm_cache_lock = threading.Lock()
+    _cache_hits = 0
+    _cache_misses = 0
+
     def __init__(self, model: Optional[ChatOpenAI] = None):
-        self.language_detector = LanguageDetector()
         # Use shared LLM if provided, else construct one from settings
         self.model = model or ChatOpenAI(
             api_key=Settings.OPENAI_API_KEY,
             model=Settings.OPENAI_MODEL,
             temperature=Settings.TEMPERATURE,
         )
+        # Cache keys use the model identity captured here, at construction
+        self._cache_model_id = _model_identity(self.model)
+        # self.model is fixed after construction, so bind JSON mode once
+        self._json_model = self._bind_json_mode(self.model)
     
     def generate_learning_goals(self, content: str, language: Optional[str] = None, count: int = 5) -> List[str]:
         """
@@ -30,84 +138,188 @@ class ContentProcessor:
             List of learning goal strings (length between 3 and 7 when possible)
         """
         if not language:
-            language = self.language_detector.detect_language(content)
+            language = detect_language(content)
 
         # Constrain count between 3 and 7
         target = max(3, min(7, int(count or 5)))
 
-        system_ar = (
-            "أنت خبير مناهج تعليمية. أنشئ أهداف تعلم واضحة وقابلة للقياس ومناسبة للمحتوى. "
-            "أعد إجابة بصيغة JSON فقط: {\"goals\":[\"goal1\",...]}. لا تُضِف أي نص آخر."
-        )
-        system_en = (
-            "You are an expert curriculum designer. Create clear, measurable learning goals appropriate to the content. "
-            "Respond ONLY as strict JSON: {\"goals\":[\"goal1\",...]}. No extra text."
-        )
-        system = system_ar if language == "arabic" else system_en
+        goals_key = self._cache_key("goals", content, language, target)
+        cached = self._cache_get(goals_key)
+        if cached is not None:
+            return cached
 
-        prompt = (
-            f"{system}\n"
-            f"Count: {target}.\n"
-            f"Content:\n{content}"
-        )
+        system = GOALS_SYSTEM_PROMPTS["arabic" if language == "arabic" else "english"]
+        prompt = f"{system}\nCount: {target}.\nContent:\n{_bounded_content(content)}"
 
         try:
-            response = self.model.invoke(prompt)
+            response = self._json_mode_model().invoke(prompt)
             raw = getattr(response, "content", str(response))
-            data = self._extract_json(raw)
-            goals = []
-            if isinstance(data, dict) and isinstance(data.get("goals"), list):
-                goals = [g for g in data["goals"] if isinstance(g, str) and g.strip()]
+            goals = self._normalize_goals(self._extract_json(raw))
         except Exception:
             goals = []
 
+        if goals:
+            self._cache_put(goals_key, goals[:target])
+
         # Minimal fallback using key topics if LLM parsing fails
         if not goals:
             analysis = self.analyze_content(content)
-            topics = analysis.get("key_topics", [])
-            if language == "arabic":
-                goals = [f"يتعرف الطالب على موضوع: {t}" for t in topics[:target]]
-            else:
-                goals = [f"Students identify the topic: {t}" for t in topics[:target]]
+            goals = self._fallback_goals(analysis.get("key_topics", []), language, target)
 
         return goals[:target]
+
+    def analyze_and_generate_goals(self, content: str, language: Optional[str] = None,
+                                   count: int = 5) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Analyze content and generate learning goals with a single LLM call.
+
+        Use this when both are needed for the same content: the content (the bulk
+        of the prompt) is sent once instead of twice. The analysis is kept so that
+        the next analyze_content() call on the same text does not hit the LLM again.
+
+        Args:
+            content: Source educational content
+            language: Desired language for the goals (auto-detected if not provided)
+            count: Target number of goals
+
+        Returns:
+            (analysis, goals) shaped exactly like analyze_content() and
+            generate_learning_goals() results
+        """
+        detected_language = detect_language(content)
+        goals_language = language or detected_language
+        target = max(3, min(7, int(count or 5)))
+        word_count = len(content.split())
+        character_count = len(content)
+
+        analysis_key = self._cache_key("analysis", content)
+        goals_key = self._cache_key("goals", content, goals_language, target)
+        cached_analysis = self._cache_get(analysis_key)
+        cached_goals = self._cache_get(goals_key)
+        if cached_analysis is not None and cached_goals is not None:
+            return cached_analysis, cached_goals
+
+        prompt = (
+            ANALYSIS_AND_GOALS_PROMPT_HEADER
+            + f"Goals count: {target}. Goals language: {goals_language}.\n"
+            f"Hint language (from a detector): {detected_language}.\n"
+            f"Raw word_count: {word_count}, character_count: {character_count}.\n\n"
+            "Content:\n" + _bounded_content(content)
+        )
+
+        try:
+            response = self._json_mode_model().invoke(prompt)
+            raw = getattr(response, "content", str(response))
+            data = self._extract_json(raw)
+        except Exception:
+            data = {}
+
+        analysis_data = data.get("analysis") if isinstance(data, dict) else None
+        analysis = self._normalize_analysis(analysis_data, content, detected_language, word_count, character_count)
+        if isinstance(analysis_data, dict) and analysis_data:
+            self._cache_put(analysis_key, analysis)
+
+        goals = self._normalize_goals(data)
+        if goals:
+            self._cache_put(goals_key, goals[:target])
+        else:
+            goals = self._fallback_goals(analysis.get("key_topics", []), goals_language, target)
+
+        return analysis, goals[:target]
     
     def analyze_content(self, content: str) -> Dict[str, Any]:
         """
         Analyze content using the LLM to extract structured insights.
 
         The AI returns a JSON object with:
-        language, word_count, character_count, estimated_reading_time,
-        complexity_level, key_topics, is_mathematical, math_concepts,
-        has_equations, has_numbers, subject_area.
+        language, estimated_reading_time, complexity_level, key_topics,
+        is_mathematical, math_concepts, has_equations, has_numbers, subject_area.
+        word_count and character_count are computed locally and added to the result.
         """
+        analysis_key = self._cache_key("analysis", content)
+        cached = self._cache_get(analysis_key)
+        if cached is not None:
+            return cached
+
         # Basic metrics to assist/validate AI output
-        detected_language = self.language_detector.detect_language(content)
+        detected_language = detect_language(content)
         word_count = len(content.split())
         character_count = len(content)
 
         prompt = (
-            "You are an expert educational content analyst.\n"
-            "Analyze the following content and return ONLY a strict JSON object with these exact keys: \n"
-            "language (\"arabic\" or \"english\"), word_count (int), character_count (int), "
-            "estimated_reading_time (int, minutes), complexity_level (one of: simple, medium, complex), "
-            "key_topics (array of 3-7 short keywords in the same language as the content, no markup), "
-            "is_mathematical (boolean), math_concepts (array of up to 10 concise math terms, empty if not mathematical; do not include symbols or punctuation-only items), "
-            "has_equations (boolean), has_numbers (boolean), subject_area (one of: mathematics, science, language, literature, history, general).\n\n"
-            f"Hint language (from a detector): {detected_language}.\n"
-            f"Raw word_count: {word_count}, character_count: {character_count}.\n"
-            "Use your own judgment based on the content; don't echo the content.\n"
-            "If the content is not about math, set is_mathematical=false and math_concepts=[].\n\n"
-            "Content:\n" + content
+            ANALYSIS_PROMPT_HEADER
+            + f"Hint language (from a detector): {detected_language}.\n"
+            f"Raw word_count: {word_count}, character_count: {character_count}.\n\n"
+            "Content:\n" + _bounded_content(content)
         )
 
         try:
-            response = self.model.invoke(prompt)
+            response = self._json_mode_model().invoke(prompt)
             raw = getattr(response, "content", str(response))
             data = self._extract_json(raw)
         except Exception:
             data = {}
 
+        result = self._normalize_analysis(data, content, detected_language, word_count, character_count)
+        # Only cache real LLM output; heuristic fallbacks should be retried next time
+        if isinstance(data, dict) and data:
+            self._cache_put(analysis_key, result)
+        return result
+
+    @staticmethod
+    def _bind_json_mode(model: Any) -> Any:
+        """Return the model bound to OpenAI JSON mode (the model itself if it can't be bound)."""
+        bind = getattr(model, "bind", None)
+        if bind is None:
+            return model
+        try:
+            return bind(response_format={"type": "json_object"})
+        except Exception:
+            return model
+
+    def _json_mode_model(self):
+        """Return the JSON-mode model when ANALYSIS_JSON_MODE is enabled, else the plain model."""
+        if not Settings.ANALYSIS_JSON_MODE:
+            return self.model
+        return self._json_model
+
+    @classmethod
+    def get_cache_stats(cls) -> Dict[str, int]:
+        """Hit/miss counters and current size of the shared LLM result cache."""
+        return {"hits": cls._cache_hits, "misses": cls._cache_misses, "size": len(cls._llm_cache)}
+
+    def _cache_key(self, kind: str, content: str, *params: Any) -> Tuple:
+        """Key on content, the configured analysis model (name, temperature) and params."""
+        digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+        return (kind, digest, *self._cache_model_id, *params)
+
+    def _cache_get(self, key: Tuple) -> Any:
+        if Settings.ANALYSIS_CACHE_SIZE <= 0:
+            return None
+        cls = type(self)
+        with self._llm_cache_lock:
+            hit = self._llm_cache.get(key)
+            if hit is None:
+                cls._cache_misses += 1
+                return None
+            self._llm_cache.move_to_end(key)
+            cls._cache_hits += 1
+        # Callers may mutate the result (e.g. embed it in _metadata); never hand out the cached object
+        return copy_json(hit)
+
+    def _cache_put(self, key: Tuple, value: Any) -> None:
+        if Settings.ANALYSIS_CACHE_SIZE <= 0:
+            return
+        stored = copy_json(value)
+        with self._llm_cache_lock:
+            self._llm_cache[key] = stored
+            self._llm_cache.move_to_end(key)
+            while len(self._llm_cache) > Settings.ANALYSIS_CACHE_SIZE:
+                self._llm_cache.popitem(last=False)
+
+    def _normalize_analysis(self, data: Any, content: str, detected_language: str,
+                            word_count: int, character_count: int) -> Dict[str, Any]:
+        """Fill gaps in the LLM analysis with heuristic fallbacks and normalize types."""
         # Fallbacks and normalization
         def _get(key, default):
             return data[key] if isinstance(data, dict) and key in data else default
@@ -115,8 +327,9 @@ class ContentProcessor:
         language = _get("language", detected_language)
         result = {
             "language": language,
-            "word_count": int(_get("word_count", word_count) or word_count),
-            "character_count": int(_get("character_count", character_count) or character_count),
+            # Counted in Python; the model is not asked to echo them
+            "word_count": word_count,
+            "character_count": character_count,
             "estimated_reading_time": int(_get("estimated_reading_time", self._estimate_reading_time(content, language))),
             "complexity_level": _get("complexity_level", self._assess_complexity(content)),
             "key_topics": _get("key_topics", self._extract_key_topics_fallback(content, language)),
@@ -132,6 +345,18 @@ class ContentProcessor:
             result["math_concepts"] = []
 
         return result
+
+    def _normalize_goals(self, data: Any) -> List[str]:
+        """Non-empty string goals from a {"goals": [...]} LLM payload."""
+        if isinstance(data, dict) and isinstance(data.get("goals"), list):
+            return [g for g in data["goals"] if isinstance(g, str) and g.strip()]
+        return []
+
+    def _fallback_goals(self, topics: List[str], language: str, target: int) -> List[str]:
+        """Minimal topic-based goals when the LLM gives none."""
+        if language == "arabic":
+            return [f"يتعرف الطالب على موضوع: {t}" for t in topics[:target]]
+        return [f"Students identify the topic: {t}" for t in topics[:target]]
     
     def preprocess_content(self, content: str) -> str:
         """
@@ -146,8 +371,13 @@ class ContentProcessor:
         # Remove excessive whitespace
         content = " ".join(content.split())
         
-        # Ensure proper encoding
-        content = content.encode('utf-8', errors='ignore').decode('utf-8')
+        # Ensure proper encoding: only lone surrogates fail to encode, so clean
+        # strings (always true for ASCII) skip the bytes round-trip
+        if not content.isascii():
+            try:
+                content.encode('utf-8')
+            except UnicodeEncodeError:
+                content = content.encode('utf-8', errors='ignore').decode('utf-8')
         
         return content.strip()
     
@@ -160,12 +390,13 @@ class ContentProcessor:
     
     def _assess_complexity(self, content: str) -> str:
         """Assess content complexity level."""
-        word_count = len(content.split())
-        avg_word_length = sum(len(word) for word in content.split()) / max(1, word_count)
+        words = content.split()
+        word_count = len(words)
+        avg_word_length = sum(map(len, words)) / max(1, word_count)
 
-        # Check for mathematical symbols and equations (ignore plain hyphen to avoid false positives)
-        math_symbols = re.findall(r'[+*/=<>≤≥∑∏∫∂√π∞%]', content)
-        has_equations = bool(re.search(r'[\w\u0621-\u064A]+\s*[=<>≤≥]\s*[\w\u0621-\u064A]+', content))
+        # Check for mathematical symbols and equations (ignore plain hyphen to avoid false positives);
+        # the equation scan only matters when no symbol was found
+        is_math = bool(_MATH_SYMBOLS_RE.search(content)) or bool(_EQUATION_RE.search(content))
 
         base_complexity = 0
         if word_count < 100 and avg_word_length < 5:
@@ -176,7 +407,7 @@ class ContentProcessor:
             base_complexity = 3  # complex
 
         # Increase complexity for mathematical content
-        if math_symbols or has_equations:
+        if is_math:
             base_complexity = min(3, base_complexity + 1)
 
         complexity_map = {1: "simple", 2: "medium", 3: "complex"}
@@ -184,19 +415,12 @@ class ContentProcessor:
     
     def _extract_key_topics_fallback(self, content: str, language: str) -> List[str]:
         """Lightweight fallback to extract key topics if AI parsing fails."""
-        words = content.split()
-        common_words = {
-            "arabic": {"في", "من", "إلى", "على", "عن", "مع", "هذا", "هذه", "التي", "الذي", "أن", "كان", "يكون"},
-            "english": {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "is", "are", "was"},
-        }
-        stop_words = common_words.get(language, set())
-        word_freq: Dict[str, int] = {}
-        for word in words:
-            word = word.strip(".,!?;:\"'()[]{}").lower()
-            if len(word) > 3 and word not in stop_words:
-                word_freq[word] = word_freq.get(word, 0) + 1
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, _ in sorted_words[:5]]
+        stop_words = _TOPIC_STOP_WORDS.get(language, frozenset())
+        word_freq = Counter(
+            word for word in (w.strip(_TOPIC_STRIP_CHARS) for w in content.lower().split())
+            if len(word) > 3 and word not in stop_words
+        )
+        return [word for word, _ in word_freq.most_common(5)]
     
     # Removed rule-based math detection; rely on AI output. Keep minimal helpers for fallbacks only.
     
@@ -204,54 +428,36 @@ class ContentProcessor:
     
     def _has_equations(self, content: str) -> bool:
         """Check if content contains mathematical equations."""
-        equation_patterns = [
-            r'[\w\u0621-\u064A]+\s*[=<>≤≥]\s*[\w\u0621-\u064A]+',  # x = y or inequalities (Arabic/English)
-            r'\d+\s*[+\-*/×÷\^]\s*\d+',  # basic arithmetic
-            r'[\w\u0621-\u064A]+\s*[<>≤≥]\s*[\w\u0621-\u064A]+',  # inequalities
-            r'\w+\^\d+',  # exponents
-            r'sqrt\(\w+\)',  # square roots
-            r'log\(\w+\)',  # logarithms
-        ]
-        
-        for pattern in equation_patterns:
-            if re.search(pattern, content):
-                return True
-        
-        return False
+        return any(pattern.search(content) for pattern in _EQUATION_PATTERNS)
     
     def _has_numbers(self, content: str) -> bool:
         """Check if content contains numbers."""
-        return bool(re.search(r'\d+', content))
+        return bool(_NUMBER_RE.search(content))
 
     def _identify_subject_area_fallback(self, content: str, language: str) -> str:
         """Simple fallback subject area identification when AI output is unavailable."""
-        content_lower = content.lower()
-        indicators = {
-            "mathematics": ["رياضيات", "معادلة", "جبر", "هندسة", "math", "algebra", "geometry", "equation"],
-            "science": ["علوم", "فيزياء", "كيمياء", "أحياء", "science", "physics", "chemistry", "biology"],
-            "language": ["لغة", "نحو", "صرف", "grammar", "language", "reading", "writing"],
-            "literature": ["أدب", "شعر", "قصة", "رواية", "literature", "poetry", "novel", "story"],
-            "history": ["تاريخ", "حضارة", "قرن", "history", "ancient", "modern", "century"],
-        }
+        found = set(_SUBJECT_INDICATOR_RE.findall(content.lower()))
         scores: Dict[str, int] = {}
-        for subject, inds in indicators.items():
-            scores[subject] = sum(1 for ind in inds if re.search(rf'(?:^|\W){re.escape(ind)}(?:\W|$)', content_lower))
+        for subject, indicators in _SUBJECT_INDICATORS.items():
+            scores[subject] = sum(1 for ind in indicators if ind in found)
         scores = {k: v for k, v in scores.items() if v > 0}
         return max(scores, key=scores.get) if scores else "general"
 
     def _extract_json(self, text: str) -> Dict[str, Any]:
-        """Extract the first valid JSON object from text."""
+        """Extract the first valid JSON object from text (JSON mode responses parse on the first try)."""
+        if not text:
+            return {}
         try:
-            return json.loads(text)
+            return _json_loads(text)
         except Exception:
             pass
-        # Attempt to locate a JSON block
-        start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            snippet = text[start : end + 1]
+        # Try each top-level {...} block in turn, skipping prose, fences and any
+        # placeholder braces in the prose ("use the {key} field")
+        for snippet in iter_json_objects(text):
             try:
-                return json.loads(snippet)
+                parsed = _json_loads(snippet)
             except Exception:
-                return {}
+                continue
+            if isinstance(parsed, dict) and parsed:
+                return parsed
         return {}
@@ -1,12 +1,53 @@
 from typing import Dict, Any, List
-from utils.language_detector import LanguageDetector
+from utils.language_detector import detect_language
+
+_QUESTION_TYPE_NAMES = {
+    "arabic": {
+        "multiple_choice": "أسئلة اختيار من متعدد",
+        "short_answer": "أسئلة إجابة قصيرة",
+        "complete": "أسئلة إكمال",
+        "true_false": "أسئلة صح/خطأ"
+    },
+    "english": {
+        "multiple_choice": "Multiple Choice Questions",
+        "short_answer": "Short Answer Questions",
+        "complete": "Completion Questions",
+        "true_false": "True/False Questions"
+    },
+}
+
+_LEVEL_NAMES = {
+    "arabic": {1: "سهل", 2: "متوسط", 3: "صعب"},
+    "english": {1: "Easy", 2: "Medium", 3: "Hard"},
+}
+
+_WORKSHEET_SECTIONS = {
+    "arabic": """أقسام ورقة العمل المطلوبة:
+1. الأهداف التعليمية
+2. التطبيقات العملية
+3. المفردات الأساسية
+4. إرشادات للمعلم""",
+    "english": """Required Worksheet Sections:
+1. Learning Goals
+2. Practical Applications
+3. Key Vocabulary
+4. Teacher Guidelines""",
+}
+
+_SUMMARY_STRUCTURE = {
+    "arabic": """هيكل الملخص المطلوب:
+1. افتتاحية: مقدمة جذابة
+2. خلاصة: النقاط الرئيسية
+3. خاتمة: ربط وتلخيص""",
+    "english": """Required Summary Structure:
+1. Opening: Engaging introduction
+2. Summary: Key points
+3. Ending: Connection and conclusion""",
+}
 
 class PromptBuilder:
     """Builds dynamic prompts based on content and requirements."""
     
-    def __init__(self):
-        self.language_detector = LanguageDetector()
-    
     def build_question_prompt(self, content: str, goals: List[str], 
                             question_counts: Dict[str, int], 
                             difficulty_levels: List[int]) -> Dict[str, str]:
@@ -22,7 +63,7 @@ class PromptBuilder:
         Returns:
             Dictionary with prompt components
         """
-        language = self.language_detector.detect_language(content)
+        language = detect_language(content)
         
         prompt_components = {
             "language": language,
@@ -36,7 +77,7 @@ class PromptBuilder:
     
     def build_worksheet_prompt(self, content: str, goals: List[str]) -> Dict[str, str]:
         """Build prompt for worksheet generation."""
-        language = self.language_detector.detect_language(content)
+        language = detect_language(content)
         
         return {
             "language": language,
@@ -47,7 +88,7 @@ class PromptBuilder:
     
     def build_summary_prompt(self, content: str) -> Dict[str, str]:
         """Build prompt for summary generation."""
-        language = self.language_detector.detect_language(content)
+        language = detect_language(content)
         
         return {
             "language": language,
@@ -73,82 +114,40 @@ class PromptBuilder:
             else:
                 return "Achieve general educational objectives appropriate for the content"
         
-        if language == "arabic":
-            formatted = "الأهداف التعليمية:\n"
-        else:
-            formatted = "Learning Objectives:\n"
-            
-        for i, goal in enumerate(goals, 1):
-            formatted += f"{i}. {goal}\n"
-            
-        return formatted.strip()
+        header = "الأهداف التعليمية:" if language == "arabic" else "Learning Objectives:"
+        lines = (f"{i}. {goal}" for i, goal in enumerate(goals, 1))
+        return "\n".join((header, *lines)).strip()
     
     def _format_question_distribution(self, question_counts: Dict[str, int], language: str) -> str:
         """Format question count requirements."""
         if language == "arabic":
-            type_names = {
-                "multiple_choice": "أسئلة اختيار من متعدد",
-                "short_answer": "أسئلة إجابة قصيرة",
-                "complete": "أسئلة إكمال",
-                "true_false": "أسئلة صح/خطأ"
-            }
+            type_names = _QUESTION_TYPE_NAMES["arabic"]
             header = "توزيع الأسئلة المطلوب:"
         else:
-            type_names = {
-                "multiple_choice": "Multiple Choice Questions",
-                "short_answer": "Short Answer Questions",
-                "complete": "Completion Questions",
-                "true_false": "True/False Questions"
-            }
+            type_names = _QUESTION_TYPE_NAMES["english"]
             header = "Required Question Distribution:"
         
-        formatted = header + "\n"
-        for q_type, count in question_counts.items():
-            type_name = type_names.get(q_type, q_type)
-            formatted += f"- {type_name}: {count}\n"
-            
-        return formatted.strip()
+        lines = (f"- {type_names.get(q_type, q_type)}: {count}" for q_type, count in question_counts.items())
+        return "\n".join((header, *lines)).strip()
     
     def _format_difficulty_guidance(self, difficulty_levels: List[int], language: str) -> str:
         """Format difficulty level guidance."""
         if language == "arabic":
-            level_names = {1: "سهل", 2: "متوسط", 3: "صعب"}
+            level_names = _LEVEL_NAMES["arabic"]
             header = "مستويات الصعوبة المطلوبة:"
+            label = "المستوى"
         else:
-            level_names = {1: "Easy", 2: "Medium", 3: "Hard"}
+            level_names = _LEVEL_NAMES["english"]
             header = "Required Difficulty Levels:"
+            label = "Level"
         
-        formatted = header + "\n"
-        for level in difficulty_levels:
-            level_name = level_names.get(level, str(level))
-            formatted += f"- المستوى {level} ({level_name})\n" if language == "arabic" else f"- Level {level} ({level_name})\n"
-            
-        return formatted.strip()
+        lines = (f"- {label} {level} ({level_names.get(level, str(level))})" for level in difficulty_levels)
+        return "\n".join((header, *lines)).strip()
     
     def _get_worksheet_sections(self, language: str) -> str:
         """Get worksheet section requirements."""
-        if language == "arabic":
-            return """أقسام ورقة العمل المطلوبة:
-1. الأهداف التعليمية
-2. التطبيقات العملية
-3. المفردات الأساسية
-4. إرشادات للمعلم"""
-        else:
-            return """Required Worksheet Sections:
-1. Learning Goals
-2. Practical Applications
-3. Key Vocabulary
-4. Teacher Guidelines"""
+        return _WORKSHEET_SECTIONS["arabic" if language == "arabic" else "english"]
     
     def _get_summary_structure(self, language: str) -> str:
         """Get summary structure requirements."""
-        if language == "arabic":
-            return """هيكل الملخص المطلوب:
-1. افتتاحية: مقدمة جذابة
-2. خلاصة: النقاط الرئيسية
-3. خاتمة: ربط وتلخيص"""
-        else:
-            return """Required Summary Structure:
-1. Opening: Engaging introduction
-2. Summary: Key points
-3. Ending: Connection and conclusion"""
+        return _SUMMARY_STRUCTURE["arabic" if language == "arabic" else "english"]
@@ -20,25 +20,11 @@ ARABIC_MINDMAP_PROMPTS = {
 
 احذف/تجنب أي كلمة دالة على: مثال، على سبيل المثال، مثلاً، قصة، حالة، توضيح، تجربة، حكاية.
 
-مثال مبسط للشكل (للصيغة فقط وليس للمحتوى):
-{{
-    "class": "go.TreeModel",
-    "nodeDataArray": [
-        {{"key":0, "text":"العنوان الرئيسي", "loc":"0 0"}},
-        {{"key":1, "parent":0, "text":"محور أساسي"}},
-        {{"key":11, "parent":1, "text":"فكرة فرعية"}},
-        {{"key":2, "parent":0, "text":"محور آخر"}}
-    ]
-}}
+الصيغة (للشكل فقط وليس للمحتوى): {{"class":"go.TreeModel","nodeDataArray":[{{"key":0,"text":"العنوان الرئيسي","loc":"0 0"}},{{"key":1,"parent":0,"text":"محور أساسي"}},{{"key":11,"parent":1,"text":"فكرة فرعية"}}]}}
 
 التعليمات المختصرة:
-1. استخرج المحاور الجوهرية فقط المرتبطة بعنوان الدرس.
-2. لخص المفاهيم دون أمثلة أو شروحات سردية.
-3. لا تتجاوز عمق فرعي (جذر->محور->تفصيل). امنع أي طبقة أعمق.
-4. التزم بالعدد المحدد للفروع والتفرعات.
-5. استخدم الحقول: key, parent, text, و loc (للجذر فقط "0 0").
-6. لا تضف الحقول brush أو dir (يضيفها النظام لاحقاً).
-7. أعد JSON صالح فقط.
+1. استخرج المحاور الجوهرية فقط المرتبطة بعنوان الدرس، ولخص المفاهيم دون أمثلة أو شروحات سردية.
+2. استخدم الحقول: key, parent, text, و loc (للجذر فقط "0 0"). لا تضف الحقول brush أو dir (يضيفها النظام لاحقاً).
 
 حلل النص الآتي وأنشئ الخريطة وفق الضوابط:
 {context}"""
@@ -59,4 +45,9 @@ ARABIC_MINDMAP_PROMPTS = {
 النص:
 {context}
 """
+    ,
+    "plan_section": """
+
+المخطط المبدئي (التزم بالجذر والمحاور والمفاهيم الفرعية الواردة فيه، وأخرج JSON فقط):
+{plan}"""
 }
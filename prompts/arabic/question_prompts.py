@@ -1,17 +1,5 @@
 ARABIC_QUESTION_PROMPTS = {
-    "main_template": """أنت مدرس خبير في إنشاء الأسئلة التعليمية. مهمتك هي إنشاء بنك أسئلة شامل باللغة العربية بناءً على المحتوى التعليمي المقدم والأهداف التعليمية.
-
-المحتوى التعليمي:
-{content}
-
-الأهداف التعليمية:
-{goals}
-
-عدد الأسئلة المطلوب إنشاؤها:
-{question_counts}
-
-مستويات الصعوبة المطلوبة: {difficulty_levels}
-(1 = سهل، 2 = متوسط، 3 = صعب)
+    "main_template": """أنت مدرس خبير في إنشاء الأسئلة التعليمية. مهمتك هي إنشاء بنك أسئلة شامل باللغة العربية بناءً على المحتوى التعليمي والأهداف التعليمية المقدمة في النهاية.
 
 تعليمات مهمة:
 1. أنشئ أسئلة متنوعة ومناسبة للمحتوى والأهداف
@@ -24,16 +12,22 @@ ARABIC_QUESTION_PROMPTS = {
 
 {format_instructions}
 
-أنشئ بنك الأسئلة الآن:""",
-
-    "math_thinking_template": """أنت مدرس رياضيات خبير متخصص في إنشاء أسئلة تتطلب التفكير والاستدلال المنطقي.
-
-المحتوى الرياضي:
+المحتوى التعليمي:
 {content}
 
 الأهداف التعليمية:
 {goals}
 
+عدد الأسئلة المطلوب إنشاؤها:
+{question_counts}
+
+مستويات الصعوبة المطلوبة: {difficulty_levels}
+(1 = سهل، 2 = متوسط، 3 = صعب)
+
+أنشئ بنك الأسئلة الآن:""",
+
+    "math_thinking_template": """أنت مدرس رياضيات خبير متخصص في إنشاء أسئلة تتطلب التفكير والاستدلال المنطقي. المحتوى الرياضي والأهداف التعليمية مقدمة في النهاية.
+
 عند إنشاء الأسئلة الرياضية، اتبع مبادئ التفكير المنطقي:
 
 1. **أسئلة حل المسائل خطوة بخطوة**: تتطلب من الطالب إظهار طريقة الحل
@@ -52,17 +46,23 @@ ARABIC_QUESTION_PROMPTS = {
 - ما خطوات الحل المنطقية؟
 - كيف يمكن التحقق من الإجابة؟
 
-عدد الأسئلة المطلوبة: {question_counts}
-مستويات الصعوبة: {difficulty_levels}
-
-{format_instructions}
-
 ملاحظات مهمة:
 - solution_outline يجب أن تكون موجزة جدًا (٢–٤ خطوات قصيرة) وتعرض الخطة العامة للحل فقط.
 - worked_solution يجب أن تكون موجزة ومهيكلة (formula، substitution، result، verification اختياري) بدون تفصيلات استدلالية مطوّلة.
 - لا تدرج أي تفكير داخلي مطوّل أو تسلسل طويل للتعليل.
 - عند كون الناتج رقمًا، قرّبه إلى أربعة منازل عشرية واستخدم نفس التنسيق في كل من answer و worked_solution.result، وتأكد من التطابق.
 
+{format_instructions}
+
+المحتوى الرياضي:
+{content}
+
+الأهداف التعليمية:
+{goals}
+
+عدد الأسئلة المطلوبة: {question_counts}
+مستويات الصعوبة: {difficulty_levels}
+
 أنشئ الأسئلة الرياضية مع التركيز على التفكير المنطقي وإرفاق solution_outline الموجزة حيثما كان مناسبًا:""",
 
     "multiple_choice_prompt": """أنشئ أسئلة متعددة الخيارات بناءً على المحتوى التالي:
@@ -1,11 +1,5 @@
 ARABIC_WORKSHEET_PROMPTS = {
-    "main_template": """أنت مدرس خبير في تصميم أوراق العمل التعليمية. مهمتك هي إنشاء ورقة عمل شاملة باللغة العربية بناءً على المحتوى التعليمي والأهداف المقدمة.
-
-المحتوى التعليمي:
-{content}
-
-الأهداف التعليمية:
-{goals}
+    "main_template": """أنت مدرس خبير في تصميم أوراق العمل التعليمية. مهمتك هي إنشاء ورقة عمل شاملة باللغة العربية بناءً على المحتوى التعليمي والأهداف المقدمة في النهاية.
 
 تعليمات مهمة:
 1. أنشئ أهدافاً تعليمية واضحة ومحددة
@@ -16,5 +10,11 @@ ARABIC_WORKSHEET_PROMPTS = {
 
 {format_instructions}
 
+المحتوى التعليمي:
+{content}
+
+الأهداف التعليمية:
+{goals}
+
 أنشئ ورقة العمل الآن:"""
 }
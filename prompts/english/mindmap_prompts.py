@@ -20,25 +20,11 @@ Node Text Rules:
 
 Filter out any node whose text would revolve around: example, for example, e.g., case study, story, scenario, illustration, experiment (and their paraphrases).
 
-Minimal structural example (format only):
-{{
-    "class": "go.TreeModel",
-    "nodeDataArray": [
-        {{"key":0, "text":"Main Topic", "loc":"0 0"}},
-        {{"key":1, "parent":0, "text":"Core Axis"}},
-        {{"key":11, "parent":1, "text":"Sub Idea"}},
-        {{"key":2, "parent":0, "text":"Another Axis"}}
-    ]
-}}
+Format (structure only): {{"class":"go.TreeModel","nodeDataArray":[{{"key":0,"text":"Main Topic","loc":"0 0"}},{{"key":1,"parent":0,"text":"Core Axis"}},{{"key":11,"parent":1,"text":"Sub Idea"}}]}}
 
 Concise Instructions:
-1. Extract only essential, title-aligned conceptual groupings.
-2. Summarize—don't reproduce prose or examples.
-3. Enforce depth limit (no grandchildren of level-2).
-4. Keep within branch and sub-branch count limits.
-5. Fields allowed: key, parent, text, loc (root only loc = "0 0").
-6. Do NOT add brush or dir (system will append them).
-7. Return valid JSON only.
+1. Extract only essential, title-aligned conceptual groupings; summarize—don't reproduce prose or examples.
+2. Fields allowed: key, parent, text, loc (root only loc = "0 0"). Do NOT add brush or dir (system will append them).
 
 Analyze the text and build the map under these constraints:
 {context}"""
@@ -59,4 +45,9 @@ Then output ONLY the final GoJS JSON:
 Text:
 {context}
 """
+    ,
+    "plan_section": """
+
+Planning outline (follow its root, branches and sub-concepts; output only the JSON):
+{plan}"""
 }
@@ -1,17 +1,5 @@
 ENGLISH_QUESTION_PROMPTS = {
-    "main_template": """You are an expert educational content creator specializing in question bank generation. Your task is to create a comprehensive question bank in English based on the provided educational content and learning objectives.
-
-Educational Content:
-{content}
-
-Learning Objectives:
-{goals}
-
-Required question counts:
-{question_counts}
-
-Required difficulty levels: {difficulty_levels}
-(1 = Easy, 2 = Medium, 3 = Hard)
+    "main_template": """You are an expert educational content creator specializing in question bank generation. Your task is to create a comprehensive question bank in English based on the educational content and learning objectives provided at the end.
 
 Important Instructions:
 1. Create diverse questions appropriate for the content and objectives
@@ -24,16 +12,22 @@ Important Instructions:
 
 {format_instructions}
 
-Create the question bank now:""",
-
-    "math_thinking_template": """You are an expert mathematics teacher specializing in creating questions that require thinking and logical reasoning.
-
-Mathematical Content:
+Educational Content:
 {content}
 
 Learning Objectives:
 {goals}
 
+Required question counts:
+{question_counts}
+
+Required difficulty levels: {difficulty_levels}
+(1 = Easy, 2 = Medium, 3 = Hard)
+
+Create the question bank now:""",
+
+    "math_thinking_template": """You are an expert mathematics teacher specializing in creating questions that require thinking and logical reasoning. The mathematical content and learning objectives are provided at the end.
+
 When creating mathematical questions, follow logical thinking principles:
 
 1. **Step-by-step problem solving questions**: Require students to show their solution method
@@ -52,17 +46,23 @@ Follow this thinking model:
 - What are the logical solution steps?
 - How can the answer be verified?
 
-Number of questions required: {question_counts}
-Difficulty levels: {difficulty_levels}
-
-{format_instructions}
-
 Important notes:
 - solution_outline must be very concise (2–4 short steps) and only show a high-level plan.
 - worked_solution must be succinct and structured (formula, substitution, result) and must not contain internal step-by-step chain-of-thought.
 - When the output is numeric, round to four decimals and ensure answer and worked_solution.result exactly match.
 - Do not include lengthy internal chain-of-thought or detailed token-by-token reasoning.
 
+{format_instructions}
+
+Mathematical Content:
+{content}
+
+Learning Objectives:
+{goals}
+
+Number of questions required: {question_counts}
+Difficulty levels: {difficulty_levels}
+
 Create mathematical questions focusing on logical thinking and attach a concise solution_outline when appropriate:""",
 
     "multiple_choice_prompt": """Create multiple choice questions based on the following content:
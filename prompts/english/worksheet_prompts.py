@@ -1,11 +1,5 @@
 ENGLISH_WORKSHEET_PROMPTS = {
-    "main_template": """You are an expert educational worksheet designer. Your task is to create a comprehensive worksheet in English based on the provided educational content and objectives.
-
-Educational Content:
-{content}
-
-Learning Objectives:
-{goals}
+    "main_template": """You are an expert educational worksheet designer. Your task is to create a comprehensive worksheet in English based on the educational content and objectives provided at the end.
 
 Important Instructions:
 1. Create clear and specific learning goals
@@ -16,5 +10,11 @@ Important Instructions:
 
 {format_instructions}
 
+Educational Content:
+{content}
+
+Learning Objectives:
+{goals}
+
 Create the worksheet now:"""
 }
@@ -1,4 +1,6 @@
 from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import PromptTemplate
 import uuid
@@ -10,6 +12,69 @@ from models.question_models import QuestionBank, LearningGoal, GoalQuestionMappi
 from models.worksheet_models import Worksheet, LearningGoalWorksheet
 from config.settings import Settings
 
+# (keyword, level) pairs in priority order: Arabic verbs first, then English;
+# the first keyword found in the goal text decides the level
+_COGNITIVE_LEVEL_KEYWORDS = tuple(
+    (keyword, level)
+    for keywords, level in (
+        # Arabic cognitive level keywords
+        (('يحلل', 'يقيم', 'ينقد', 'يقارن'), 'analyze'),
+        (('يطبق', 'يستخدم', 'يحل', 'ينفذ'), 'apply'),
+        (('يفهم', 'يشرح', 'يفسر', 'يوضح'), 'understand'),
+        (('يذكر', 'يسمي', 'يعدد', 'يحدد'), 'remember'),
+        (('ينشئ', 'يصمم', 'يبتكر', 'يؤلف'), 'create'),
+        # English cognitive level keywords
+        (('analyze', 'evaluate', 'critique', 'compare'), 'analyze'),
+        (('apply', 'use', 'solve', 'implement'), 'apply'),
+        (('understand', 'explain', 'interpret', 'clarify'), 'understand'),
+        (('remember', 'list', 'identify', 'define'), 'remember'),
+        (('create', 'design', 'develop', 'compose'), 'create'),
+    )
+    for keyword in keywords
+)
+
+@lru_cache(maxsize=4096)
+def _cognitive_level(goal_text: str) -> str:
+    """Cognitive level for a goal text (memoized; curriculum goals repeat across documents)."""
+    goal_lower = goal_text.lower()
+    for keyword, level in _COGNITIVE_LEVEL_KEYWORDS:
+        if keyword in goal_lower:
+            return level
+    return 'understand'  # Default
+
+_ARABIC_COGNITIVE_LEVELS = {
+    'remember': 'التذكر',
+    'understand': 'الفهم',
+    'apply': 'التطبيق',
+    'analyze': 'التحليل',
+    'evaluate': 'التقييم',
+    'create': 'الإبداع'
+}
+
+# Appended to the content for each goal's question call
+_GOAL_EMPHASIS_TEMPLATES = {
+    "arabic": """
+
+التركيز على الهدف التعليمي المحدد:
+🎯 {goal}
+
+مستوى التفكير المطلوب: {level}
+
+يجب أن تركز الأسئلة المتولدة بشكل خاص على تحقيق هذا الهدف التعليمي.
+
+""",
+    "english": """
+
+Focus on the specific learning goal:
+🎯 {goal}
+
+Required cognitive level: {level}
+
+Generated questions should specifically focus on achieving this learning goal.
+
+""",
+}
+
 class GoalBasedTemplate(BaseTemplate):
     """Template for generating goal-based educational content."""
     
@@ -156,33 +221,7 @@ Formatting Instructions:
     
     def _determine_cognitive_level(self, goal_text: str) -> str:
         """Determine the cognitive level based on goal text."""
-        goal_lower = goal_text.lower()
-        
-        # Arabic cognitive level keywords
-        if any(word in goal_lower for word in ['يحلل', 'يقيم', 'ينقد', 'يقارن']):
-            return 'analyze'
-        elif any(word in goal_lower for word in ['يطبق', 'يستخدم', 'يحل', 'ينفذ']):
-            return 'apply'
-        elif any(word in goal_lower for word in ['يفهم', 'يشرح', 'يفسر', 'يوضح']):
-            return 'understand'
-        elif any(word in goal_lower for word in ['يذكر', 'يسمي', 'يعدد', 'يحدد']):
-            return 'remember'
-        elif any(word in goal_lower for word in ['ينشئ', 'يصمم', 'يبتكر', 'يؤلف']):
-            return 'create'
-        
-        # English cognitive level keywords
-        elif any(word in goal_lower for word in ['analyze', 'evaluate', 'critique', 'compare']):
-            return 'analyze'
-        elif any(word in goal_lower for word in ['apply', 'use', 'solve', 'implement']):
-            return 'apply'
-        elif any(word in goal_lower for word in ['understand', 'explain', 'interpret', 'clarify']):
-            return 'understand'
-        elif any(word in goal_lower for word in ['remember', 'list', 'identify', 'define']):
-            return 'remember'
-        elif any(word in goal_lower for word in ['create', 'design', 'develop', 'compose']):
-            return 'create'
-        
-        return 'understand'  # Default
+        return _cognitive_level(goal_text)
     
     def _generate_questions_for_goals(self, content: str, goals: List[LearningGoal], 
                                     question_counts: Dict[str, int], 
@@ -204,16 +243,25 @@ Formatting Instructions:
         questions_per_goal = self._distribute_questions_per_goal(question_counts, total_goals)
 
         print(f"🎯 Generating questions for {total_goals} goals:")
-
-        any_enhanced_thinking = False
         for goal in goals:
             print(f"   • {goal.text[:60]}...")
 
-            # Generate questions specifically for this goal
-            goal_specific_questions = self._generate_questions_for_single_goal(
+        # Generate questions specifically for each goal. The calls are independent,
+        # so they run concurrently; results come back in goal order.
+        def generate_for_goal(goal: LearningGoal) -> Dict[str, List]:
+            return self._generate_questions_for_single_goal(
                 content, goal, questions_per_goal, difficulty_levels, content_analysis
             )
 
+        workers = max(1, min(Settings.GOAL_QUESTION_WORKERS, total_goals))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                goal_results = list(executor.map(generate_for_goal, goals))
+        else:
+            goal_results = [generate_for_goal(goal) for goal in goals]
+
+        any_enhanced_thinking = False
+        for goal, goal_specific_questions in zip(goals, goal_results):
             # Track questions by goal
             questions_by_goal[goal.id] = goal_specific_questions
 
@@ -225,24 +273,25 @@ Formatting Instructions:
             except Exception:
                 pass
 
-            # Add goal information to each question
+            # Add goal information to each question (skipping metadata keys)
+            goal_id, goal_text = goal.id, goal.text
+            question_types = {}
             for question_type, questions in goal_specific_questions.items():
-                # Skip metadata keys
                 if question_type.startswith('_'):
                     continue
                 for question in questions:
-                    question['target_goal'] = goal.text
-                    question['goal_id'] = goal.id
-                    all_questions[question_type].append(question)
+                    question['target_goal'] = goal_text
+                    question['goal_id'] = goal_id
+                all_questions[question_type].extend(questions)
+                question_types[question_type] = len(questions)
 
             # Create mapping entry
-            mapping = GoalQuestionMapping(
-                goal_id=goal.id,
-                goal_text=goal.text,
-                question_count=sum(len(qs) for qtype, qs in goal_specific_questions.items() if not qtype.startswith('_')),
-                question_types={qtype: len(qs) for qtype, qs in goal_specific_questions.items() if not qtype.startswith('_')}
-            )
-            goal_question_mapping.append(mapping)
+            goal_question_mapping.append(GoalQuestionMapping(
+                goal_id=goal_id,
+                goal_text=goal_text,
+                question_count=sum(question_types.values()),
+                question_types=question_types
+            ))
 
         # Create the result
         result: Dict[str, Any] = {
@@ -250,8 +299,8 @@ Formatting Instructions:
             'short_answer': all_questions['short_answer'],
             'complete': all_questions['complete'],
             'true_false': all_questions['true_false'],
-            'learning_goals': [goal.dict() for goal in goals],
-            'goal_question_mapping': [mapping.dict() for mapping in goal_question_mapping],
+            'learning_goals': [goal.model_dump() for goal in goals],
+            'goal_question_mapping': [mapping.model_dump() for mapping in goal_question_mapping],
             'questions_by_goal': questions_by_goal,
             '_goal_based_metadata': {
                 'total_goals': total_goals,
@@ -321,44 +370,20 @@ Formatting Instructions:
     
     def _create_goal_focused_content(self, content: str, goal: LearningGoal) -> str:
         """Create content that emphasizes the specific learning goal."""
-        goal_emphasis = ""
-        
         if self.language == "arabic":
-            goal_emphasis = f"""
-
-التركيز على الهدف التعليمي المحدد:
-🎯 {goal.text}
-
-مستوى التفكير المطلوب: {self._get_arabic_cognitive_level(goal.cognitive_level)}
-
-يجب أن تركز الأسئلة المتولدة بشكل خاص على تحقيق هذا الهدف التعليمي.
-
-"""
+            goal_emphasis = _GOAL_EMPHASIS_TEMPLATES["arabic"].format(
+                goal=goal.text, level=self._get_arabic_cognitive_level(goal.cognitive_level)
+            )
         else:
-            goal_emphasis = f"""
-
-Focus on the specific learning goal:
-🎯 {goal.text}
-
-Required cognitive level: {goal.cognitive_level}
-
-Generated questions should specifically focus on achieving this learning goal.
-
-"""
+            goal_emphasis = _GOAL_EMPHASIS_TEMPLATES["english"].format(
+                goal=goal.text, level=goal.cognitive_level
+            )
         
         return content + goal_emphasis
     
     def _get_arabic_cognitive_level(self, cognitive_level: str) -> str:
         """Get Arabic translation of cognitive levels."""
-        mapping = {
-            'remember': 'التذكر',
-            'understand': 'الفهم',
-            'apply': 'التطبيق',
-            'analyze': 'التحليل',
-            'evaluate': 'التقييم',
-            'create': 'الإبداع'
-        }
-        return mapping.get(cognitive_level, 'الفهم')
+        return _ARABIC_COGNITIVE_LEVELS.get(cognitive_level, 'الفهم')
     
     def _generate_default_goals(self, content: str, content_analysis: Dict[str, Any]) -> List[str]:
         """Generate default learning goals if none provided."""
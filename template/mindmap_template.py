@@ -1,11 +1,15 @@
 from typing import Dict, Any, List
 from typing import Tuple, Set, Callable, Optional
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
+import hashlib
 import json
 import re
 import logging
+import threading
 from json_repair import repair_json
 
 # Optional faster JSON library
@@ -14,17 +18,34 @@ try:  # pragma: no cover - optional dependency
 except ImportError:  # pragma: no cover
     orjson = None  # type: ignore
 
+_json_loads = orjson.loads if orjson else json.loads
+
 from template.base_template import BaseTemplate
 from prompts.arabic.mindmap_prompts import ARABIC_MINDMAP_PROMPTS
 from prompts.english.mindmap_prompts import ENGLISH_MINDMAP_PROMPTS
 from models.mindmap_models import MindMapResponse
 from config.settings import Settings
 from utils.mindmap_postprocess import post_process_mindmap
+from utils.json_copy import copy_json
+from utils.json_extract import iter_json_objects
 
 logger = logging.getLogger(__name__)
 
+_PUA_RE = re.compile(r'[\uf000-\uf8ff]')
+_WS_RE = re.compile(r"\s+")
+
+
+def _norm_text(t: Any) -> str:
+    """Normalize node text for deduplication."""
+    return _WS_RE.sub(" ", str(t or "")).strip().lower()
+
+
 class MindMapTemplate(BaseTemplate):
     """Template for generating mind maps."""
+
+    # Process-wide cache of generated mind maps (shared by all instances/threads)
+    _result_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+    _result_cache_lock = threading.Lock()
     
     def __init__(self, model):
         super().__init__(model)
@@ -32,6 +53,8 @@ class MindMapTemplate(BaseTemplate):
             "arabic": ARABIC_MINDMAP_PROMPTS,
             "english": ENGLISH_MINDMAP_PROMPTS
         }
+        # Chains keyed by (language, planning); shared by chunk worker threads
+        self._chain_cache: Dict[Tuple[Optional[str], Any], Any] = {}
     
     def get_prompt_template(self, language: str) -> str:
         """Get the appropriate prompt template for the given language."""
@@ -42,75 +65,51 @@ class MindMapTemplate(BaseTemplate):
         prompts = self.prompt_templates.get(language, self.prompt_templates["english"])
         return prompts.get("planning_template")
     
-    _CODE_BLOCK_JSON_RE = re.compile(r'```json\s*|```', re.IGNORECASE)
-    _FIRST_JSON_OBJECT_RE = re.compile(r'(\{.*\})', re.DOTALL)
-
     def clean_and_parse_json(self, response_text: str) -> Dict[str, Any]:
         """Optimized JSON cleaning & parsing with early exits.
 
         Performance notes:
-        - Avoid repeated regex compilation (precompiled class attrs)
-        - Minimize expensive repair_json/orjson calls (only when necessary)
-        - Fast path returns ASAP for already valid JSON
-        - Fallback sequence: direct -> whitespace normalized -> repair -> repair(normalized)
+        - Bare JSON responses are parsed straight away, before any scanning
+        - Linear scan over the top-level {...} candidates (no fence/regex passes),
+          each parsed with a single C-level call (orjson > json)
+        - Fallback: one repair_json(return_objects=True) call, which yields the
+          Python object directly (no second parse of the repaired string)
         """
-        snippet = (response_text or "")[:200]
-        logger.debug(f"Original response (truncated): {snippet}...")
-
-        text = self._CODE_BLOCK_JSON_RE.sub('', response_text or '').strip()
-
-        # Narrow to first JSON-like block if extra explanation exists
-        m = self._FIRST_JSON_OBJECT_RE.search(text)
-        if m:
-            text = m.group(1)
+        logger.debug("Original response (truncated): %.200s...", response_text or "")
 
-        # Trim outside braces just in case
-        start = text.find('{')
-        end = text.rfind('}')
-        if start != -1 and end != -1 and end > start:
-            text = text[start:end+1]
-        text_stripped = text.strip()
-
-        # Fast path 1: direct parse (orjson > json)
-        try:
-            if orjson:  # pragma: no cover
-                return orjson.loads(text_stripped)  # type: ignore
-            return json.loads(text_stripped)
-        except Exception:
-            pass
-
-        # Prepare normalized variant (single spaces)
-        normalized = re.sub(r'\s+', ' ', text_stripped)
-        if normalized != text_stripped:
+        # Bare JSON (the usual case in JSON mode): parse without scanning for the object
+        bare = (response_text or '').strip()
+        if bare[:1] == '{' and bare[-1:] == '}':
             try:
-                if orjson:  # pragma: no cover
-                    return orjson.loads(normalized)  # type: ignore
-                return json.loads(normalized)
+                return _json_loads(bare)
             except Exception:
                 pass
 
-        # Attempt repair on original
-        try:
-            repaired = repair_json(text_stripped)
+        # Walk the top-level {...} candidates (fences and prose fall away). Prose can carry
+        # braces of its own ("use the {key} field"), so take the first one that parses
+        candidates = list(iter_json_objects(response_text or ''))
+        for candidate in candidates:
             try:
-                if orjson:  # pragma: no cover
-                    return orjson.loads(repaired)  # type: ignore
-                return json.loads(repaired)
+                parsed = _json_loads(candidate)
             except Exception:
-                # If repair returns but still fails, continue to normalized repair
-                pass
-        except Exception as e:  # pragma: no cover
-            logger.debug(f"repair_json original failed: {e}")
+                continue
+            if isinstance(parsed, dict) and parsed:
+                return parsed
 
-        # Attempt repair on normalized form
+        # Nothing parsed: repair the largest candidate (the map, not a placeholder from the prose)
+        text = max(candidates, key=len) if candidates else (response_text or '')
+        text_stripped = text.strip()
+
+        # Single repair pass (also handles raw newlines inside strings, truncation, etc.)
         try:
-            repaired_norm = repair_json(normalized)
-            if orjson:  # pragma: no cover
-                return orjson.loads(repaired_norm)  # type: ignore
-            return json.loads(repaired_norm)
+            repaired = repair_json(text_stripped, return_objects=True)
         except Exception as e:
-            logger.error(f"All JSON parsing strategies failed: {e}; text excerpt={text_stripped[:500]}")
+            logger.error("All JSON parsing strategies failed: %s; text excerpt=%.500s", e, text_stripped)
             raise ValueError("Unable to parse response as valid JSON") from e
+        if not isinstance(repaired, dict):
+            logger.error("All JSON parsing strategies failed; text excerpt=%.500s", text_stripped)
+            raise ValueError("Unable to parse response as valid JSON")
+        return repaired
     
     def generate(self, content: str, goals: List[str] = None, **kwargs) -> Dict[str, Any]:
         """
@@ -133,17 +132,31 @@ class MindMapTemplate(BaseTemplate):
         
         content = self._sanitize_content(content)
 
+        cache_key = self._cache_key(content)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.debug("Mind map cache hit")
+            return cached
+
+        result = self._generate_uncached(content)
+        if result:
+            self._cache_put(cache_key, result)
+        return result
+
+    def _generate_uncached(self, content: str) -> Dict[str, Any]:
         # If multi-pass is enabled and content is long, split into chunks and merge
         if Settings.MINDMAP_MULTI_PASS and len(content) > Settings.MINDMAP_CHUNK_SIZE_CHARS:
             logger.debug("Using multi-pass chunking for long content")
             chunks = self._chunk_text(content, Settings.MINDMAP_CHUNK_SIZE_CHARS, Settings.MINDMAP_CHUNK_OVERLAP_CHARS)
-            partial_maps: List[Dict[str, Any]] = []
-            for idx, ch in enumerate(chunks):
-                logger.debug(f"Generating partial mind map for chunk {idx+1}/{len(chunks)} size={len(ch)}")
-                mm = self._generate_single_pass(ch)
-                if not mm:
-                    continue
-                partial_maps.append(mm)
+            logger.debug("Generating %d partial mind maps (chunk sizes=%s)", len(chunks), [len(ch) for ch in chunks])
+            # Chunks are independent LLM calls; run them concurrently and keep chunk order
+            workers = max(1, min(Settings.MINDMAP_CHUNK_WORKERS, len(chunks)))
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(self._generate_single_pass, chunks))
+            else:
+                results = [self._generate_single_pass(ch) for ch in chunks]
+            partial_maps: List[Dict[str, Any]] = [mm for mm in results if mm]
             if not partial_maps:
                 return None
             merged = self._merge_mindmaps(partial_maps)
@@ -155,6 +168,35 @@ class MindMapTemplate(BaseTemplate):
         return self._generate_single_pass(content)
 
 
+    # ---- Result cache helpers ----
+    def _cache_key(self, content: str) -> Tuple[str, Optional[str], Optional[str], Optional[float]]:
+        """Key on sanitized content plus everything that changes the output (language, model, temperature)."""
+        digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+        model_name = getattr(self.model, "model_name", None) or getattr(self.model, "model", None)
+        temperature = getattr(self.model, "temperature", None)
+        return (digest, self.language, str(model_name) if model_name else None, temperature)
+
+    def _cache_get(self, key) -> Optional[Dict[str, Any]]:
+        if Settings.MINDMAP_CACHE_SIZE <= 0:
+            return None
+        with self._result_cache_lock:
+            hit = self._result_cache.get(key)
+            if hit is None:
+                return None
+            self._result_cache.move_to_end(key)
+        # Callers annotate the result (e.g. _metadata); never hand out the cached object
+        return copy_json(hit)
+
+    def _cache_put(self, key, value: Dict[str, Any]) -> None:
+        if Settings.MINDMAP_CACHE_SIZE <= 0:
+            return
+        stored = copy_json(value)
+        with self._result_cache_lock:
+            self._result_cache[key] = stored
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > Settings.MINDMAP_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+
     def _post_process_mindmap(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Delegate to shared utility for post-processing."""
         return post_process_mindmap(data)
@@ -163,7 +205,7 @@ class MindMapTemplate(BaseTemplate):
     def _sanitize_content(self, content: str) -> str:
         content = (content or "").strip()
         # Filter out problematic characters
-        content = re.sub(r'[\uf000-\uf8ff]', '', content)
+        content = _PUA_RE.sub('', content)
         # Normalize whitespace
         content = " ".join(content.split())
         return content
@@ -176,11 +218,13 @@ class MindMapTemplate(BaseTemplate):
         n = len(text)
         while start < n:
             end = min(n, start + size)
-            # Try to end at a sentence boundary within the window
-            window = text[start:end]
-            last_period = max(window.rfind('.'), window.rfind('!'), window.rfind('?'), window.rfind('\n'))
-            if last_period != -1 and (start + last_period + 1) - start > size * 0.6:
-                end = start + last_period + 1
+            # Try to end at a sentence boundary within the window. Only boundaries past 60% of
+            # the window are accepted, so search just that tail, in place (no window slice)
+            lo = start + int(size * 0.6)
+            last_period = max(text.rfind('.', lo, end), text.rfind('!', lo, end),
+                              text.rfind('?', lo, end), text.rfind('\n', lo, end))
+            if last_period != -1:
+                end = last_period + 1
             chunk = text[start:end].strip()
             if chunk:
                 chunks.append(chunk)
@@ -189,42 +233,55 @@ class MindMapTemplate(BaseTemplate):
             start = max(0, end - max(0, overlap))
         return chunks
 
-    def _generate_single_pass(self, content: str) -> Dict[str, Any]:
-        # Get the prompt template for the detected language
-        prompt_template = self.get_prompt_template(self.language)
-        use_planning = Settings.MINDMAP_ENHANCED_THINKING and bool(self.get_planning_template(self.language))
+    def _json_mode_model(self):
+        """Return the model bound to OpenAI JSON mode (when enabled and supported)."""
+        if not Settings.MINDMAP_JSON_MODE:
+            return self.model
+        bind = getattr(self.model, "bind", None)
+        if bind is None:
+            return self.model
+        try:
+            return bind(response_format={"type": "json_object"})
+        except Exception as e:  # pragma: no cover - model without response_format support
+            logger.debug("JSON mode unavailable, using plain model: %s", e)
+            return self.model
 
-        # Create the prompt(s)
-        if use_planning:
-            planning_prompt = ChatPromptTemplate.from_template(self.get_planning_template(self.language))
-            main_prompt = ChatPromptTemplate.from_template(prompt_template)
-        else:
-            main_prompt = ChatPromptTemplate.from_template(prompt_template)
+    def _plan_outline(self, docs: List[Document]) -> Optional[str]:
+        """Run the planning prompt and return its outline for the main prompt (None if unavailable)."""
+        planning_template = self.get_planning_template(self.language)
+        if not planning_template:
+            return None
+        p_cache_key = (self.language, 'planning')
+        try:
+            if p_cache_key not in self._chain_cache:
+                planning_prompt = ChatPromptTemplate.from_template(planning_template)
+                self._chain_cache[p_cache_key] = create_stuff_documents_chain(llm=self.model, prompt=planning_prompt)
+            plan = self._chain_cache[p_cache_key].invoke({"context": docs})
+        except Exception as e:
+            logger.debug("Planning phase failed/ignored: %s", e)
+            return None
+        return plan.strip() or None
+
+    def _generate_single_pass(self, content: str) -> Dict[str, Any]:
+        docs = [Document(page_content=content)]
+        plan = self._plan_outline(docs) if Settings.MINDMAP_ENHANCED_THINKING else None
 
-        # Create chain(s) (cache by language & planning usage to avoid recreating per chunk)
-        cache_key = (self.language, use_planning)
-        if not hasattr(self, '_chain_cache'):
-            self._chain_cache: Dict[Tuple[Optional[str], bool], Any] = {}
+        # Chains are cached by language & planning usage to avoid recreating them per chunk
+        cache_key = (self.language, plan is not None)
         if cache_key not in self._chain_cache:
-            self._chain_cache[cache_key] = create_stuff_documents_chain(llm=self.model, prompt=main_prompt)
+            prompt_template = self.get_prompt_template(self.language)
+            if plan is not None:
+                prompts = self.prompt_templates.get(self.language, self.prompt_templates["english"])
+                prompt_template += prompts["plan_section"]
+            main_prompt = ChatPromptTemplate.from_template(prompt_template)
+            self._chain_cache[cache_key] = create_stuff_documents_chain(llm=self._json_mode_model(), prompt=main_prompt)
         main_chain = self._chain_cache[cache_key]
-        docs = [Document(page_content=content)]
+        inputs = {"context": docs} if plan is None else {"context": docs, "plan": plan}
 
         try:
-            logger.debug(f"Generating mind map (single-pass) for content: {content[:100]}...")
-            if use_planning:
-                try:
-                    # Planning chain is lighter; cache separately
-                    p_cache_key = (self.language, 'planning')
-                    if p_cache_key not in self._chain_cache:
-                        self._chain_cache[p_cache_key] = create_stuff_documents_chain(llm=self.model, prompt=planning_prompt)
-                    planning_chain = self._chain_cache[p_cache_key]
-                    _ = planning_chain.invoke({"context": docs})
-                except Exception as e:
-                    logger.debug(f"Planning phase failed/ignored: {e}")
-
-            response = main_chain.invoke({"context": docs})
-            logger.debug(f"Raw API response: {str(response)[:200]}...")
+            logger.debug("Generating mind map (single-pass) for content: %.100s...", content)
+            response = main_chain.invoke(inputs)
+            logger.debug("Raw API response: %.200s...", response)
             mind_map_data = self.clean_and_parse_json(response)
             mind_map_data = self._post_process_mindmap(mind_map_data)
 
@@ -234,7 +291,7 @@ class MindMapTemplate(BaseTemplate):
                 mind_map_data["class"] = "go.TreeModel"
             return mind_map_data
         except Exception as e:
-            logger.error(f"Error in single-pass generation: {e}")
+            logger.error("Error in single-pass generation: %s", e)
             return None
     def _merge_mindmaps(self, maps: List[Dict[str, Any]]) -> Dict[str, Any]:
         # Combine multiple mind maps into a single GoJS tree model
@@ -255,29 +312,16 @@ class MindMapTemplate(BaseTemplate):
 
         # Determine next key and remap keys to keep unique
         next_key = 1
-        # Group by parent=None to find roots per map (original)
-        roots: List[Dict[str, Any]] = []
-        for m in maps:
-            nodes = m.get("nodeDataArray") if isinstance(m, dict) else None
-            if not isinstance(nodes, list):
-                continue
-            for n in nodes:
-                if n.get("parent") is None:
-                    roots.append(n)
-
-        # Map old->new keys across all nodes
-        key_map: Dict[Tuple[int, int], int] = {}
         # To deduplicate by parent/text
         seen_by_parent_text: Set[Tuple[int, str]] = set()
-
-        # Helper: normalize text for deduplication
-        def norm_text(t: Any) -> str:
-            s = str(t or "")
-            s = re.sub(r"\s+", " ", s).strip().lower()
-            return s
+        dedupe = Settings.MINDMAP_DEDUPLICATE_NODES
+        # Nodes past the limit would be truncated below, so stop remapping once it is reached
+        max_nodes = Settings.MINDMAP_MAX_NODES
 
         # Assign main branches for each map's root under synthetic root
         for idx, m in enumerate(maps):
+            if len(merged_nodes) >= max_nodes:
+                break
             nodes = m.get("nodeDataArray") if isinstance(m, dict) else None
             if not isinstance(nodes, list) or not nodes:
                 continue
@@ -294,38 +338,35 @@ class MindMapTemplate(BaseTemplate):
             chunk_title = root.get("text") or (f"Chunk {idx+1}")
             # Don't assign dir and brush here - let post-processing handle it
             branch = {"key": branch_key, "parent": 0, "text": chunk_title}
-            if (0, norm_text(chunk_title)) not in seen_by_parent_text or not Settings.MINDMAP_DEDUPLICATE_NODES:
+            branch_text_key = (0, _norm_text(chunk_title))
+            if branch_text_key not in seen_by_parent_text or not dedupe:
                 merged_nodes.append(branch)
-                seen_by_parent_text.add((0, norm_text(chunk_title)))
+                seen_by_parent_text.add(branch_text_key)
             # Build adjacency for this map
             children: Dict[Any, List[Dict[str, Any]]] = {}
             for n in nodes:
                 children.setdefault(n.get("parent"), []).append(n)
-            # Remap subtree under this branch
-            stack = [(root, branch_key)]
-            while stack:
-                orig_node, new_parent = stack.pop()
+            # Remap subtree under this branch breadth-first, so the node limit keeps shallow
+            # concepts and the first of any duplicate siblings wins
+            queue = deque([(root, branch_key)])
+            while queue and len(merged_nodes) < max_nodes:
+                orig_node, new_parent = queue.popleft()
+                orig_key = orig_node.get("key")
                 # Skip the original root since we represented it as branch
                 if orig_node is root:
-                    for ch in children.get(orig_node.get("key"), []):
-                        stack.append((ch, branch_key))
+                    queue.extend((ch, branch_key) for ch in children.get(orig_key, ()))
                     continue
+                text = orig_node.get("text")
+                if dedupe:
+                    parent_text_key = (new_parent, _norm_text(text))
+                    if parent_text_key in seen_by_parent_text:
+                        # skip duplicate under same parent
+                        continue
+                    seen_by_parent_text.add(parent_text_key)
                 new_key = next_key; next_key += 1
                 # Only copy key, parent, and text - let post-processing add brush and dir
-                new_node = {
-                    "key": new_key,
-                    "parent": new_parent,
-                    "text": orig_node.get("text")
-                }
-                parent_text_key = (new_parent, norm_text(new_node.get("text")))
-                if Settings.MINDMAP_DEDUPLICATE_NODES and parent_text_key in seen_by_parent_text:
-                    # skip duplicate under same parent
-                    pass
-                else:
-                    merged_nodes.append(new_node)
-                    seen_by_parent_text.add(parent_text_key)
-                    for ch in children.get(orig_node.get("key"), []):
-                        stack.append((ch, new_key))
+                merged_nodes.append({"key": new_key, "parent": new_parent, "text": text})
+                queue.extend((ch, new_key) for ch in children.get(orig_key, ()))
 
         # Enforce max nodes
         if len(merged_nodes) > Settings.MINDMAP_MAX_NODES:
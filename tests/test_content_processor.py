@@ -0,0 +1,42 @@
+import json
+from processors.content_processor import ContentProcessor
+
+
+class DummyResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class CountingModel:
+    """A stub chat model that counts calls and returns a fixed analysis."""
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.temperature = 0.7
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return DummyResponse(json.dumps({
+            "language": "english",
+            "complexity_level": "basic",
+            "key_topics": ["fractions"],
+            "is_mathematical": True,
+            "subject_area": "mathematics",
+        }))
+
+
+def test_analyze_content_reuses_cached_analysis():
+    model = CountingModel("gpt-4o-mini")
+    processor = ContentProcessor(model)
+    content = "Adding fractions with unlike denominators: 1/2 + 1/3 = 5/6 (cache reuse test)."
+
+    first = processor.analyze_content(content)
+    second = processor.analyze_content(content)
+
+    assert model.calls == 1
+    assert second == first
+
+
+if __name__ == '__main__':
+    test_analyze_content_reuses_cached_analysis()
+    print('ContentProcessor tests passed.')
@@ -1,4 +1,5 @@
 import json
+import sys
 from template.mindmap_template import MindMapTemplate
 from template.base_template import BaseTemplate
 from config.settings import Settings
@@ -17,28 +18,100 @@ class DummyChain:
     def invoke(self, _):
         return self.response
 
+def _parser() -> MindMapTemplate:
+    # Parsing never calls the model; the stub keeps BaseTemplate from building a real ChatOpenAI
+    return MindMapTemplate(model=DummyModel("{}"))
+
+
 def test_clean_and_parse_json_basic():
-    mt = MindMapTemplate(model=None)  # real model not used in parsing test
+    mt = _parser()
     good_json = '{"class": "go.TreeModel", "nodeDataArray": [{"key":1,"text":"Root"}]}'
     parsed = mt.clean_and_parse_json(good_json)
     assert parsed['class'] == 'go.TreeModel'
 
 
 def test_clean_and_parse_json_with_code_fence():
-    mt = MindMapTemplate(model=None)
+    mt = _parser()
     fenced = """```json\n{\n  \"class\": \"go.TreeModel\",\n  \"nodeDataArray\": [ {\n    \"key\": 1, \"text\": \"Root\" } ]\n}\n```"""
     parsed = mt.clean_and_parse_json(fenced)
     assert parsed['nodeDataArray'][0]['text'] == 'Root'
 
 
 def test_clean_and_parse_json_repair():
-    mt = MindMapTemplate(model=None)
+    mt = _parser()
     broken = '{"class": "go.TreeModel", "nodeDataArray": [{"key":1,"text":"Root"}]'  # missing closing brace
     parsed = mt.clean_and_parse_json(broken)
     assert parsed['class'] == 'go.TreeModel'
 
+
+def test_clean_and_parse_json_raw_newline_in_string():
+    mt = _parser()
+    raw = 'Here is the map: {"class": "go.TreeModel", "nodeDataArray": [{"key":1,"text":"Line one\nline two"}]}'
+    parsed = mt.clean_and_parse_json(raw)
+    assert parsed['nodeDataArray'][0]['text'] == 'Line one\nline two'
+
+
+def test_clean_and_parse_json_ignores_trailing_prose_with_braces():
+    mt = _parser()
+    text = 'Here it is:\n```json\n{"class": "go.TreeModel", "nodeDataArray": [{"key":1,"text":"A {b} \\" }"}]}\n```\nNote: use {key} as ids.'
+    parsed = mt.clean_and_parse_json(text)
+    assert parsed['nodeDataArray'][0]['text'] == 'A {b} " }'
+
+
+def test_clean_and_parse_json_skips_leading_prose_with_braces():
+    mt = _parser()
+    text = 'Use the {key} field: {"class": "go.TreeModel", "nodeDataArray": [{"key":1,"text":"Root"}]}'
+    parsed = mt.clean_and_parse_json(text)
+    assert parsed['nodeDataArray'][0]['text'] == 'Root'
+
+
+def test_clean_and_parse_json_rejects_non_json():
+    mt = _parser()
+    try:
+        mt.clean_and_parse_json("Sorry, I cannot help with that.")
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
+
+
+def test_generate_reuses_cached_result_for_same_content():
+    # Stub model: with model=None BaseTemplate would build a real ChatOpenAI
+    mt = MindMapTemplate(model=DummyModel("{}"))
+    mt.set_language("english")
+    calls = []
+
+    def fake_generate(content):
+        calls.append(content)
+        return {"class": "go.TreeModel", "nodeDataArray": [{"key": 0, "text": "Root"}]}
+
+    mt._generate_uncached = fake_generate
+    first = mt.generate("Photosynthesis   converts light energy.")
+    first["_metadata"] = {"mutated": True}
+    second = mt.generate("Photosynthesis converts light energy.")
+    assert len(calls) == 1
+    assert "_metadata" not in second
+
+def test_post_process_handles_maps_deeper_than_recursion_limit():
+    from utils.mindmap_postprocess import post_process_mindmap
+    depth = sys.getrecursionlimit() + 100
+    nodes = [{"key": 0, "text": "Root"}] + [{"key": i, "parent": i - 1, "text": f"Node {i}"} for i in range(1, depth)]
+    saved = (Settings.MINDMAP_MAX_NODES, Settings.MINDMAP_MAX_DEPTH)
+    Settings.MINDMAP_MAX_NODES, Settings.MINDMAP_MAX_DEPTH = depth, -1
+    try:
+        result = post_process_mindmap({"nodeDataArray": nodes})
+    finally:
+        Settings.MINDMAP_MAX_NODES, Settings.MINDMAP_MAX_DEPTH = saved
+    deepest = result["nodeDataArray"][-1]
+    assert deepest["dir"] == "left" and "brush" in deepest and "_depth" not in deepest
+
 if __name__ == '__main__':
     test_clean_and_parse_json_basic()
     test_clean_and_parse_json_with_code_fence()
     test_clean_and_parse_json_repair()
+    test_clean_and_parse_json_raw_newline_in_string()
+    test_clean_and_parse_json_ignores_trailing_prose_with_braces()
+    test_clean_and_parse_json_skips_leading_prose_with_braces()
+    test_clean_and_parse_json_rejects_non_json()
+    test_generate_reuses_cached_result_for_same_content()
+    test_post_process_handles_maps_deeper_than_recursion_limit()
     print('MindMapTemplate parsing tests passed.')
@@ -0,0 +1,29 @@
+"""Copy JSON-shaped data without the general ``copy.deepcopy`` machinery.
+
+Cached LLM results (analyses, goal lists, mind maps) are plain trees of dicts,
+lists and scalars. ``copy_json`` rebuilds only the containers and shares the
+immutable leaves, skipping deepcopy's memo dict and per-object dispatch.
+"""
+from __future__ import annotations
+from typing import Any
+import copy
+
+__all__ = ["copy_json"]
+
+_ATOMIC_TYPES = (str, int, float, bool, type(None))
+
+
+def copy_json(obj: Any) -> Any:
+    """Return a deep copy of a dict/list/scalar tree.
+
+    Anything else found in the tree (tuples, sets, custom objects) is handed
+    to ``copy.deepcopy`` so the result is always fully independent.
+    """
+    t = type(obj)
+    if t is dict:
+        return {k: copy_json(v) for k, v in obj.items()}
+    if t is list:
+        return [copy_json(v) for v in obj]
+    if t in _ATOMIC_TYPES:
+        return obj
+    return copy.deepcopy(obj)
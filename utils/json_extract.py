@@ -0,0 +1,67 @@
+"""Locate the JSON object inside an LLM response.
+
+Models often wrap their JSON in markdown fences or surround it with a short
+explanation. ``iter_json_objects`` walks the top-level ``{...}`` objects in
+the text, tracking brace depth and skipping braces that appear inside JSON
+strings, so fences and prose fall away naturally. Prose can contain braces of
+its own (``Use the {key} field: {...}``), so callers try each candidate in
+turn rather than trusting the first one.
+"""
+from __future__ import annotations
+from typing import Iterator
+import re
+
+__all__ = ["iter_json_objects"]
+
+# Only these characters can change the scanner state; finditer jumps between
+# them at C speed instead of visiting every character in Python.
+_STRUCTURAL_RE = re.compile(r'[{}"\\]')
+
+
+def _object_end(text: str, start: int) -> int:
+    """Return the index just past the object opening at ``start`` (-1 if never closed)."""
+    depth = 0
+    in_string = False
+    skip_pos = -1
+    for m in _STRUCTURAL_RE.finditer(text, start):
+        pos = m.start()
+        if pos == skip_pos:
+            continue
+        ch = text[pos]
+        if ch == '\\':
+            if in_string:
+                skip_pos = pos + 1  # ignore the escaped character
+            continue
+        if ch == '"':
+            in_string = not in_string
+            continue
+        if in_string:
+            continue
+        if ch == '{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+    return -1
+
+
+def iter_json_objects(text: str) -> Iterator[str]:
+    """Yield each balanced top-level ``{...}`` candidate in ``text``, in order.
+
+    Scanning resumes at the next ``{`` after each candidate, so objects nested
+    inside an earlier candidate are not yielded on their own. An object that is
+    never closed (e.g. a truncated response) is yielded from its opening brace
+    to the end of the text, and is always the last candidate.
+    """
+    if not text:
+        return
+    start = text.find('{')
+    while start != -1:
+        end = _object_end(text, start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = text.find('{', end)
+
@@ -1,10 +1,37 @@
 from langdetect import detect, DetectorFactory
+from langdetect import detector_factory
+from functools import lru_cache
 from typing import Optional
+import os
 import re
 
 # Set seed for consistent results
 DetectorFactory.seed = 0
 
+# Only Arabic and English are ever branched on; anything else falls back to
+# character-based detection, so the other ~50 n-gram profiles are dead weight.
+_PROFILE_LANGS = ("ar", "en")
+
+
+def _init_factory() -> None:
+    """Pre-load langdetect's shared factory with the Arabic and English profiles only."""
+    if detector_factory._factory is not None:
+        return
+    try:
+        profiles = []
+        for lang in _PROFILE_LANGS:
+            with open(os.path.join(detector_factory.PROFILES_DIRECTORY, lang), encoding="utf-8") as f:
+                profiles.append(f.read())
+        factory = DetectorFactory()
+        factory.load_json_profile(profiles)
+        detector_factory._factory = factory
+    except Exception:
+        # Leave the factory unset so langdetect loads its full profile set lazily
+        pass
+
+
+_init_factory()
+
 class LanguageDetector:
     """Utility class for detecting content language."""
     
@@ -80,3 +107,24 @@ class LanguageDetector:
     def is_english(text: str) -> bool:
         """Check if text is primarily in English."""
         return LanguageDetector.detect_language(text) == "english"
+
+
+# Shared detector; the class is stateless so one instance serves every caller
+_DETECTOR = LanguageDetector()
+
+# Long texts are detected from their head and tail only; the language is settled
+# well before the end, and the sample doubles as a bounded cache key
+_SAMPLE_HEAD_CHARS = 2048
+_SAMPLE_TAIL_CHARS = 512
+
+
+@lru_cache(maxsize=256)
+def _detect_sample(sample: str) -> str:
+    return _DETECTOR.detect_language(sample)
+
+
+def detect_language(text: str) -> str:
+    """Cached LanguageDetector.detect_language for repeated calls on the same content."""
+    if text and len(text) > _SAMPLE_HEAD_CHARS + _SAMPLE_TAIL_CHARS:
+        text = text[:_SAMPLE_HEAD_CHARS] + "\n" + text[-_SAMPLE_TAIL_CHARS:]
+    return _detect_sample(text)
@@ -14,6 +14,7 @@ Design goals:
 """
 from __future__ import annotations
 from typing import Dict, Any, List, Set, Tuple
+from collections import deque
 import logging
 import re
 
@@ -48,14 +49,11 @@ def post_process_mindmap(data: Dict[str, Any]) -> Dict[str, Any]:
         # 1) Enforce class
         data.setdefault("class", "go.TreeModel")
 
-        # 2) Find root and build index
+        # 2) Find root
         root = None
-        by_key = {}
         for n in nodes:
-            if isinstance(n, dict):
-                by_key[n.get("key")] = n
-                if n.get("parent") is None:
-                    root = n
+            if isinstance(n, dict) and n.get("parent") is None:
+                root = n
         if root is None:
             return data
 
@@ -63,17 +61,17 @@ def post_process_mindmap(data: Dict[str, Any]) -> Dict[str, Any]:
         if len(nodes) > Settings.MINDMAP_MAX_NODES:
             data["nodeDataArray"] = nodes[:Settings.MINDMAP_MAX_NODES]
             nodes = data["nodeDataArray"]
-            by_key = {n.get("key"): n for n in nodes if isinstance(n, dict)}
 
-        # Build children mapping
+        # Build children mapping and the key set in a single pass
         children: Dict[Any, List[Dict[str, Any]]] = {}
+        existing_keys: Set[Any] = set()
         for n in nodes:
+            existing_keys.add(n.get("key"))
             children.setdefault(n.get("parent"), []).append(n)
 
         # Orphan pruning: remove any node whose parent key is missing (except root) including its descendants
-        existing_keys = {n.get("key") for n in nodes if isinstance(n, dict)}
-        # Identify orphan roots (parent not None and parent not in existing_keys)
-        orphan_roots = [n for n in nodes if n.get("parent") is not None and n.get("parent") not in existing_keys]
+        # Orphan roots are the children of parent keys that do not exist
+        orphan_roots = [n for p, kids in children.items() if p is not None and p not in existing_keys for n in kids]
         if orphan_roots:
             orphan_keys: Set[Any] = set()
             stack = list(orphan_roots)
@@ -93,15 +91,23 @@ def post_process_mindmap(data: Dict[str, Any]) -> Dict[str, Any]:
                 for n in nodes:
                     children.setdefault(n.get("parent"), []).append(n)
 
-        # Depth assignment helper
-        def assign_depth(node, depth, visited):
-            node["_depth"] = depth
-            for ch in children.get(node.get("key"), []):
-                if ch.get("key") in visited:
-                    continue
-                visited.add(ch.get("key"))
-                assign_depth(ch, depth + 1, visited)
-        assign_depth(root, 0, {root.get("key")})
+        # Depth assignment helper (iterative BFS; every tree walk in this function is
+        # iterative, so deep maps cannot hit the recursion limit)
+        def assign_depth(root_node):
+            root_node["_depth"] = 0
+            visited = {root_node.get("key")}
+            queue = deque([root_node])
+            while queue:
+                node = queue.popleft()
+                child_depth = node["_depth"] + 1
+                for ch in children.get(node.get("key"), ()):
+                    k = ch.get("key")
+                    if k in visited:
+                        continue
+                    visited.add(k)
+                    ch["_depth"] = child_depth
+                    queue.append(ch)
+        assign_depth(root)
 
         # 5) Enforce maximum depth & remove example/unrelated nodes (if depth limit enabled)
         unlimited_depth = Settings.MINDMAP_MAX_DEPTH < 0
@@ -114,22 +120,23 @@ def post_process_mindmap(data: Dict[str, Any]) -> Dict[str, Any]:
                 "example", "examples", "e.g.", "for example", "case", "example", "e.g", "scenario", "story", "illustration", "experiment", "case study"
             ]
 
-        # Rebuild children mapping (fresh) for pruning logic
-        children = {}
-        for n in nodes:
-            children.setdefault(n.get("parent"), []).append(n)
-
+        # Breadth-first, so each node is first reached at its shallowest depth; the
+        # visited set stops duplicate keys from looping
         to_keep: Set[Any] = set()
-        def dfs_keep(node, depth):
+        visited_ids: Set[int] = {id(root)}
+        queue = deque([(root, 0)])
+        while queue:
+            node, depth = queue.popleft()
             if not unlimited_depth and depth > max_allowed_depth:  # type: ignore[arg-type]
-                return
+                continue
             text_val = str(node.get("text") or "").strip().lower()
             if Settings.MINDMAP_EXCLUDE_EXAMPLES and any(kw in text_val for kw in example_keywords):
-                return
+                continue
             to_keep.add(node.get("key"))
-            for ch in children.get(node.get("key"), []):
-                dfs_keep(ch, depth + 1)
-        dfs_keep(root, 0)
+            for ch in children.get(node.get("key"), ()):
+                if id(ch) not in visited_ids:
+                    visited_ids.add(id(ch))
+                    queue.append((ch, depth + 1))
 
         if len(to_keep) != len(nodes) and not unlimited_depth:
             pruned = []
@@ -145,7 +152,7 @@ def post_process_mindmap(data: Dict[str, Any]) -> Dict[str, Any]:
         children = {}
         for n in nodes:
             children.setdefault(n.get("parent"), []).append(n)
-        assign_depth(root, 0, {root.get("key")})
+        assign_depth(root)
 
         # 6) Color by depth
         colors = Settings.MINDMAP_COLORS
@@ -155,11 +162,27 @@ def post_process_mindmap(data: Dict[str, Any]) -> Dict[str, Any]:
 
         # 7) Direction balancing for main branches
         main_branches = children.get(root.get("key"), [])
+        descendant_counts: Dict[Any, int] = {}
         def count_descendants(node_key):
-            cnt = 0
-            for child in children.get(node_key, []):
-                cnt += 1 + count_descendants(child.get("key"))
-            return cnt
+            # Iterative post-order over keys, memoized across branches; a key already on the
+            # current path (a cycle through duplicate keys) contributes nothing further
+            on_path: Set[Any] = set()
+            stack = [(node_key, False)]
+            while stack:
+                k, expanded = stack.pop()
+                if expanded:
+                    on_path.discard(k)
+                    descendant_counts[k] = sum(
+                        1 + descendant_counts.get(ch.get("key"), 0) for ch in children.get(k, ())
+                    )
+                    continue
+                if k in descendant_counts or k in on_path:
+                    continue
+                on_path.add(k)
+                stack.append((k, True))
+                for ch in children.get(k, ()):
+                    stack.append((ch.get("key"), False))
+            return descendant_counts[node_key]
         branch_weights: List[Tuple[Dict[str, Any], int]] = []
         for branch in main_branches:
             weight = 1 + count_descendants(branch.get("key"))
@@ -171,10 +194,18 @@ def post_process_mindmap(data: Dict[str, Any]) -> Dict[str, Any]:
                 branch["dir"] = "left"; left_total += weight
             else:
                 branch["dir"] = "right"; right_total += weight
-        def propagate_dir(node):
-            for child in children.get(node.get("key"), []):
-                child["dir"] = node.get("dir")
-                propagate_dir(child)
+        def propagate_dir(branch):
+            # Every descendant takes the branch's direction
+            branch_dir = branch.get("dir")
+            seen_ids: Set[int] = {id(branch)}
+            stack = [branch]
+            while stack:
+                node = stack.pop()
+                for child in children.get(node.get("key"), ()):
+                    child["dir"] = branch_dir
+                    if id(child) not in seen_ids:
+                        seen_ids.add(id(child))
+                        stack.append(child)
         for b in main_branches:
             propagate_dir(b)
 
@@ -191,5 +222,5 @@ def post_process_mindmap(data: Dict[str, Any]) -> Dict[str, Any]:
 
         return data
     except Exception as e:
-        logger.debug(f"Post-process skipped due to error: {e}")
+        logger.debug("Post-process skipped due to error: %s", e)
         return data